@@ -2,36 +2,93 @@
 
 from __future__ import annotations
 
-import asyncio
+import logging
 from typing import TYPE_CHECKING
 
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
-from homeassistant.const import CONF_IP_ADDRESS, CONF_PORT
+from homeassistant.const import CONF_IP_ADDRESS, CONF_NAME, CONF_PORT, Platform
 from homeassistant.core import (
     HomeAssistant,
     ServiceCall,
     ServiceResponse,
     SupportsResponse,
+    callback,
 )
-from pygrenton.clu_client import CluClient, GrentonCipher
+from homeassistant.exceptions import (
+    ConfigEntryError,
+    ConfigEntryNotReady,
+    HomeAssistantError,
+    ServiceValidationError,
+)
+from homeassistant.helpers.discovery import async_load_platform
 
+from .clu import GrentonClu, GrentonConfigEntry, GrentonEntryData
 from .const import (
+    CLIENTS,
+    CLUS,
+    CONF_ADAPTIVE_CONNECTION_LIMIT,
+    CONF_ARGS,
+    CONF_BATCH_ENTITY_SETUP,
+    CONF_CACHE_MAX_AGE,
     CONF_CLIENT_IP,
     CONF_CLIENT_PORT,
+    CONF_CLU,
+    CONF_COMMAND_WINDOW,
+    CONF_CONNECTION_LIMIT,
+    CONF_DISCOVERY,
+    CONF_EVENTS,
+    CONF_INDEX,
     CONF_IV,
     CONF_KEY,
+    CONF_OBJ_ID,
     CONF_REFRESH_INTERVAL,
-    CONNECTION_LIMIT,
+    CONF_RESTORE_STATE,
+    CONF_SCRIPTS,
+    CONF_SOURCE,
+    CONFIGURED_OBJECTS,
+    DISCOVERY_STORE,
     DOMAIN,
-    GRENTON_API,
+    ENTITY_BATCHES,
+    MAX_CONNECTION_LIMIT,
+    STATE_STORE,
+)
+from .discovery import (
+    DiscoveryStore,
+    async_add_discovered,
+    async_discover,
+    configured_object_ids,
+    entity_configs,
 )
+from .events import async_subscribe_events
+from .restore import StateStore
+from .transport import Priority
 
 if TYPE_CHECKING:
     from homeassistant.helpers.typing import ConfigType
 
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_SUBSCRIPTION_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_OBJ_ID): cv.string,
+        vol.Optional(CONF_INDEX, default=[0]): vol.All(cv.ensure_list, [int]),
+    }
+)
+
+# names of scripts and their arguments become lua identifiers
+LUA_NAME = vol.Match(r"^[A-Za-z_]\w*$")
+
+SCRIPT_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_SOURCE): cv.string,
+        vol.Optional(CONF_ARGS, default=[]): vol.All(cv.ensure_list, [LUA_NAME]),
+    }
+)
+
 GRENTON_SCHEMA = vol.Schema(
     {
+        vol.Optional(CONF_NAME): cv.string,
         vol.Required(CONF_IP_ADDRESS): cv.string,
         vol.Required(CONF_PORT): int,
         vol.Required(CONF_KEY): cv.string,
@@ -39,58 +96,228 @@ GRENTON_SCHEMA = vol.Schema(
         vol.Optional(CONF_REFRESH_INTERVAL): float,
         vol.Optional(CONF_CLIENT_IP): cv.string,
         vol.Optional(CONF_CLIENT_PORT): int,
+        vol.Optional(CONF_COMMAND_WINDOW): float,
+        vol.Optional(CONF_CACHE_MAX_AGE): float,
+        vol.Optional(CONF_BATCH_ENTITY_SETUP): bool,
+        vol.Optional(CONF_CONNECTION_LIMIT): vol.All(
+            int, vol.Range(min=1, max=MAX_CONNECTION_LIMIT)
+        ),
+        vol.Optional(CONF_ADAPTIVE_CONNECTION_LIMIT): bool,
+        vol.Optional(CONF_DISCOVERY): bool,
+        vol.Optional(CONF_RESTORE_STATE): bool,
+        vol.Optional(CONF_EVENTS): [EVENT_SUBSCRIPTION_SCHEMA],
+        vol.Optional(CONF_SCRIPTS): {LUA_NAME: SCRIPT_SCHEMA},
     }
 )
 
+
+def _unique_names(configs: list[ConfigType]) -> list[ConfigType]:
+    """Reject CLUs sharing a name, they are addressed by it."""
+    names = [config.get(CONF_NAME, config[CONF_IP_ADDRESS]) for config in configs]
+    if duplicates := sorted({name for name in names if names.count(name) > 1}):
+        msg = f"CLU names must be unique: {', '.join(duplicates)}"
+        raise vol.Invalid(msg)
+    return configs
+
+
 CONFIG_SCHEMA = vol.Schema(
-    {vol.Required(DOMAIN): GRENTON_SCHEMA},
+    {vol.Optional(DOMAIN): vol.All(cv.ensure_list, [GRENTON_SCHEMA], _unique_names)},
     extra=vol.ALLOW_EXTRA,
 )
 
 REQUEST_SCHEMA = vol.Schema(
     {
         vol.Required("payload"): cv.string,
+        vol.Optional(CONF_CLU): cv.string,
+    }
+)
+
+DISCOVER_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_CLU): cv.string,
+    }
+)
+
+RUN_SCRIPT_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_NAME): cv.string,
+        vol.Optional(CONF_ARGS, default=[]): vol.All(cv.ensure_list, [cv.match_all]),
+        vol.Optional(CONF_CLU): cv.string,
+    }
+)
+
+STATS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_CLU): cv.string,
     }
 )
 
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up grenton from configuration."""
-    gconfig: dict = config[DOMAIN]
-
-    ip = gconfig[CONF_IP_ADDRESS]
-    port = gconfig[CONF_PORT]
-    key = gconfig[CONF_KEY]
-    iv = gconfig[CONF_IV]
-    client_refresh_interval = gconfig.get(CONF_REFRESH_INTERVAL, 60.0)
-    client_ip = gconfig.get(CONF_CLIENT_IP, "")
-    client_port = gconfig.get(CONF_CLIENT_PORT, 0)
-
-    client = CluClient(
-        ip,
-        port,
-        GrentonCipher(key, iv),
-        client_refresh_interval=client_refresh_interval,
-        client_ip=client_ip,
-        client_port=client_port,
-        max_connections=CONNECTION_LIMIT,
-    )
+    # values are restored before any entity is created
+    state_store = StateStore(hass)
+    await state_store.async_load()
 
-    hass.data[DOMAIN] = {}
-    hass.data[DOMAIN][GRENTON_API] = client
+    clus: dict[str, GrentonClu] = {}
+    hass.data[DOMAIN] = {
+        CLUS: clus,
+        CLIENTS: {},
+        ENTITY_BATCHES: {},
+        DISCOVERY_STORE: DiscoveryStore(hass),
+        STATE_STORE: state_store,
+        CONFIGURED_OBJECTS: configured_object_ids(config),
+    }
+    store: DiscoveryStore = hass.data[DOMAIN][DISCOVERY_STORE]
+
+    for gconfig in config.get(DOMAIN, []):
+        clu = GrentonClu(hass, gconfig, state_store)
+        clu.refresh_scheduler.async_start()
+        clu.supervisor.async_start()
+        clus[clu.name] = clu
+
+        if subscriptions := gconfig.get(CONF_EVENTS):
+            hass.async_create_background_task(
+                async_subscribe_events(hass, clu, subscriptions),
+                f"grenton_direct events {clu.name}",
+            )
+
+    async def async_setup_discovery(clu: GrentonClu) -> None:
+        try:
+            objects = await async_discover(hass, clu, store, force=False)
+        except HomeAssistantError:
+            _LOGGER.exception("Discovery of objects on %s failed", clu.name)
+            return
+
+        await async_add_discovered(hass, clu, objects, config)
+
+    for clu in clus.values():
+        if clu.discovery:
+            hass.async_create_background_task(
+                async_setup_discovery(clu), f"grenton_direct discovery {clu.name}"
+            )
+
+    _async_register_services(hass, config, clus, store)
+
+    if clus:
+        # diagnostic sensors exposing request metrics of every CLU
+        hass.async_create_task(
+            async_load_platform(hass, Platform.SENSOR, DOMAIN, {}, config)
+        )
+
+    return True
+
+
+async def async_setup_entry(hass: HomeAssistant, entry: GrentonConfigEntry) -> bool:
+    """
+    Set up a CLU from a config entry.
+
+    Entities are created for objects discovered on the CLU, only platforms
+    having any of them are loaded.
+    """
+    data = hass.data[DOMAIN]
+    clu = GrentonClu(hass, {**entry.data, **entry.options}, data[STATE_STORE])
+    clu.entry_id = entry.entry_id
+    if clu.name in data[CLUS]:
+        msg = f"CLU {clu.name} is already configured"
+        raise ConfigEntryError(msg)
+
+    try:
+        # cached objects are used, so reloads don't contact the CLU
+        clu.objects = await async_discover(
+            hass, clu, data[DISCOVERY_STORE], force=False
+        )
+    except HomeAssistantError as err:
+        raise ConfigEntryNotReady(str(err)) from err
+
+    clu.refresh_scheduler.async_start()
+    clu.supervisor.async_start()
+    data[CLUS][clu.name] = clu
+
+    configs = entity_configs(clu, clu.objects, data[CONFIGURED_OBJECTS])
+    # sensor platform carries request statistics of the CLU
+    platforms = sorted({Platform.SENSOR, *configs})
+    entry.runtime_data = GrentonEntryData(clu, platforms)
+    await hass.config_entries.async_forward_entry_setups(entry, platforms)
+
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    return True
+
+
+async def async_unload_entry(hass: HomeAssistant, entry: GrentonConfigEntry) -> bool:
+    """Unload a config entry, its client is kept for reloads."""
+    data = entry.runtime_data
+    if not await hass.config_entries.async_unload_platforms(entry, data.platforms):
+        return False
+
+    data.clu.async_stop()
+    hass.data[DOMAIN][CLUS].pop(data.clu.name, None)
+    return True
+
+
+async def _async_update_listener(
+    hass: HomeAssistant, entry: GrentonConfigEntry
+) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+@callback
+def _async_register_services(
+    hass: HomeAssistant,
+    config: ConfigType,
+    clus: dict[str, GrentonClu],
+    store: DiscoveryStore,
+) -> None:
+    def get_clu(call: ServiceCall) -> GrentonClu:
+        name = call.data.get(CONF_CLU)
+        if name is None:
+            if len(clus) == 1:
+                return next(iter(clus.values()))
+            msg = "No CLU is configured" if not clus else "Select a CLU with `clu`"
+            raise ServiceValidationError(msg)
+        if name not in clus:
+            msg = f"Unknown CLU: {name}"
+            raise ServiceValidationError(msg)
+        return clus[name]
 
     async def clu_request(call: ServiceCall) -> ServiceResponse:
         payload = call.data["payload"]
-        resp = await client.send_request_async(payload)
+        clu = get_clu(call)
+        with clu.metrics.measure("clu_request"):
+            resp = await clu.transport.send_request(payload, Priority.SERVICE)
 
         return {"response": resp}
 
     async def lua_request(call: ServiceCall) -> ServiceResponse:
         payload = call.data["payload"]
-        resp = await asyncio.to_thread(client.send_lua_request, payload)
+        clu = get_clu(call)
+        with clu.metrics.measure("lua_request"):
+            resp = await clu.transport.send_lua_request(
+                payload, priority=Priority.SERVICE
+            )
+
+        return {"response": resp}
+
+    async def run_script(call: ServiceCall) -> ServiceResponse:
+        clu = get_clu(call)
+        resp = await clu.scripts.async_call(call.data[CONF_NAME], call.data[CONF_ARGS])
 
         return {"response": resp}
 
+    async def discover(call: ServiceCall) -> ServiceResponse:
+        clu = get_clu(call)
+        objects = await async_discover(hass, clu, store, force=True)
+        added = await async_add_discovered(hass, clu, objects, config)
+
+        return {"objects": len(objects), "added": added}
+
+    async def stats(call: ServiceCall) -> ServiceResponse:
+        if CONF_CLU in call.data:
+            clu = get_clu(call)
+            return {clu.name: clu.stats()}
+
+        return {name: clu.stats() for name, clu in clus.items()}
+
     hass.services.async_register(
         DOMAIN,
         "clu_request",
@@ -105,5 +332,24 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         schema=REQUEST_SCHEMA,
         supports_response=SupportsResponse.ONLY,
     )
-
-    return True
+    hass.services.async_register(
+        DOMAIN,
+        "run_script",
+        run_script,
+        schema=RUN_SCRIPT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "discover",
+        discover,
+        schema=DISCOVER_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        "stats",
+        stats,
+        schema=STATS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
@@ -10,28 +10,33 @@ from homeassistant.components.binary_sensor import (
     DEVICE_CLASSES_SCHEMA,
     BinarySensorEntity,
 )
-from homeassistant.const import CONF_DEVICE_CLASS, CONF_NAME
+from homeassistant.const import CONF_DEVICE_CLASS, CONF_NAME, Platform
 
+from .clu import async_get_platform_entries
 from .const import (
+    CONF_CLU,
     CONF_INDEX,
     CONF_OBJ_ID,
-    DOMAIN,
-    GRENTON_API,
+    CONF_REFRESH_INTERVAL,
 )
-from .utils import GrentonObject
+from .utils import GrentonObject, add_grenton_entities, async_add_entry_entities
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
     from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
-    from pygrenton.clu_client import CluClient, UpdateContext
+    from pygrenton.clu_client import UpdateContext
+
+    from .clu import GrentonClu, GrentonConfigEntry
 
 PLATFORM_SCHEMA = cv.PLATFORM_SCHEMA.extend(
     {
         vol.Required(CONF_OBJ_ID): cv.string,
+        vol.Optional(CONF_CLU): cv.string,
         vol.Required(CONF_NAME): cv.string,
         vol.Optional(CONF_INDEX): int,
         vol.Optional(CONF_DEVICE_CLASS): DEVICE_CLASSES_SCHEMA,
+        vol.Optional(CONF_REFRESH_INTERVAL): float,
     }
 )
 
@@ -40,22 +45,38 @@ async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
     add_entities: AddEntitiesCallback,
-    discovery_info: DiscoveryInfoType | None = None,  # noqa: ARG001
+    discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Perform the setup for Sensor devices."""
-    grenton_api = hass.data[DOMAIN][GRENTON_API]
-    add_entities(
-        [GrentonBinarySensor(grenton_api, config)],
-        update_before_add=True,
+    clu, entries = await async_get_platform_entries(hass, config, discovery_info)
+    if clu is None:
+        return
+
+    add_grenton_entities(
+        hass,
+        Platform.BINARY_SENSOR,
+        [GrentonBinarySensor(clu, entry) for entry in entries],
+        add_entities,
+    )
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: GrentonConfigEntry,
+    add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up binary sensors of objects discovered on the CLU of a config entry."""
+    async_add_entry_entities(
+        hass, entry, Platform.BINARY_SENSOR, GrentonBinarySensor, add_entities
     )
 
 
 class GrentonBinarySensor(GrentonObject, BinarySensorEntity):
     """Representation of a GrentonBinarySensor."""
 
-    def __init__(self, grenton_api: CluClient, config: ConfigType) -> None:
+    def __init__(self, clu: GrentonClu, config: ConfigType) -> None:
         """Init GrentonBinarySensor."""
-        super().__init__(grenton_api, config)
+        super().__init__(clu, config)
         self._index = config.get(CONF_INDEX, 0)
 
         self._attr_device_class = config.get(CONF_DEVICE_CLASS, "")
@@ -0,0 +1,219 @@
+"""CLU connection used by grenton_direct integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_IP_ADDRESS, CONF_NAME, CONF_PORT, Platform
+from homeassistant.core import callback
+from pygrenton.clu_client import CluClient, GrentonCipher
+
+from .const import (
+    CLIENTS,
+    CLUS,
+    CONF_ADAPTIVE_CONNECTION_LIMIT,
+    CONF_BATCH_ENTITY_SETUP,
+    CONF_CACHE_MAX_AGE,
+    CONF_CLIENT_IP,
+    CONF_CLIENT_PORT,
+    CONF_CLU,
+    CONF_COMMAND_WINDOW,
+    CONF_CONNECTION_LIMIT,
+    CONF_DISCOVERY,
+    CONF_IV,
+    CONF_KEY,
+    CONF_MEMBERS,
+    CONF_OBJ_ID,
+    CONF_REFRESH_INTERVAL,
+    CONF_RESTORE_STATE,
+    CONF_SCRIPTS,
+    CONNECTION_LIMIT,
+    DEFAULT_CACHE_MAX_AGE,
+    DEFAULT_COMMAND_WINDOW,
+    DISCOVERED_ENTITIES,
+    DOMAIN,
+)
+from .events import UpdateDispatcher
+from .health import HealthSupervisor
+from .metrics import CluMetrics
+from .refresh import RefreshScheduler
+from .scheduler import CommandScheduler
+from .scripts import ScriptRegistry
+from .transport import CluTransport, Priority
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
+
+    from .discovery import DiscoveredObject
+    from .restore import StateStore
+    from .utils import GrentonObject
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class GrentonClu:
+    """Connection to a single CLU with its own client and request pipeline."""
+
+    def __init__(
+        self, hass: HomeAssistant, config: ConfigType, state_store: StateStore
+    ) -> None:
+        """Initialize GrentonClu."""
+        ip = config[CONF_IP_ADDRESS]
+        port = config[CONF_PORT]
+        cipher = GrentonCipher(config[CONF_KEY], config[CONF_IV])
+
+        self.name: str = config.get(CONF_NAME, ip)
+        self.cache_max_age: float = config.get(
+            CONF_CACHE_MAX_AGE, DEFAULT_CACHE_MAX_AGE
+        )
+        self.batch_entity_setup: bool = config.get(CONF_BATCH_ENTITY_SETUP, True)
+        self.discovery: bool = config.get(CONF_DISCOVERY, False)
+        # store of feature values restored on startup, if enabled
+        self.state_store: StateStore | None = (
+            state_store if config.get(CONF_RESTORE_STATE, True) else None
+        )
+        # objects found in CLU configuration by discovery
+        self.objects: dict[str, DiscoveredObject] = {}
+        # entities of objects added to hass, by object id
+        self.entities: dict[str, GrentonObject] = {}
+        # config entry the CLU was set up from, None for configuration.yaml
+        self.entry_id: str | None = None
+        connection_limit = config.get(CONF_CONNECTION_LIMIT, CONNECTION_LIMIT)
+
+        self.metrics = CluMetrics()
+        self.updates = _get_updates(hass, config, cipher)
+        self.client = self.updates.client
+        self.transport = CluTransport(
+            ip,
+            port,
+            cipher,
+            self.client.client_ip,
+            max_connections=connection_limit,
+            adaptive=config.get(CONF_ADAPTIVE_CONNECTION_LIMIT, False),
+            metrics=self.metrics,
+        )
+        self.scheduler = CommandScheduler(
+            hass,
+            self.transport,
+            config.get(CONF_COMMAND_WINDOW, DEFAULT_COMMAND_WINDOW),
+        )
+        self.refresh_scheduler = RefreshScheduler(hass, self.scheduler)
+        # whether the CLU responds, kept by the supervisor
+        self.available = True
+        # monotonic time the supervisor last found feature registrations
+        # intact, values cached before it are still reported on change
+        self.registrations_confirmed = -math.inf
+        self.supervisor = HealthSupervisor(hass, self)
+        self.scripts = ScriptRegistry(self, config.get(CONF_SCRIPTS, {}))
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop background work of the CLU, the client is kept for reuse."""
+        self.refresh_scheduler.async_stop()
+        self.supervisor.async_stop()
+
+    def stats(self) -> dict:
+        """Return request metrics together with connection state."""
+        return {
+            **self.metrics.as_dict(),
+            "available": self.available,
+            "in_flight": self.transport.limiter.in_flight,
+            "connection_limit": self.transport.limiter.limit,
+        }
+
+    async def async_has_object(self, object_id: str) -> bool:
+        """Check if object with given id exists on this CLU."""
+        return (
+            await self.scheduler.execute(f"{object_id} ~= nil", Priority.BACKGROUND)
+            is True
+        )
+
+
+@dataclass
+class GrentonEntryData:
+    """CLU set up from a config entry."""
+
+    clu: GrentonClu
+    # platforms the entry was forwarded to
+    platforms: list[Platform] = field(default_factory=list)
+
+
+GrentonConfigEntry = ConfigEntry[GrentonEntryData]
+
+
+def _get_updates(
+    hass: HomeAssistant, config: ConfigType, cipher: GrentonCipher
+) -> UpdateDispatcher:
+    """
+    Get update dispatcher of a client connected with given settings.
+
+    `CluClient` can't be stopped, so a client created for a config entry is
+    kept together with its registrations when the entry is reloaded.
+    """
+    settings = {
+        "ip": config[CONF_IP_ADDRESS],
+        "port": config[CONF_PORT],
+        "client_refresh_interval": config.get(CONF_REFRESH_INTERVAL, 60.0),
+        "client_ip": config.get(CONF_CLIENT_IP, ""),
+        "client_port": config.get(CONF_CLIENT_PORT, 0),
+        "max_connections": config.get(CONF_CONNECTION_LIMIT, CONNECTION_LIMIT),
+    }
+    key = (config[CONF_KEY], config[CONF_IV], *settings.values())
+
+    clients: dict[tuple, UpdateDispatcher] = hass.data[DOMAIN][CLIENTS]
+    if key not in clients:
+        clients[key] = UpdateDispatcher(CluClient(cipher=cipher, **settings))
+    return clients[key]
+
+
+async def async_get_clu(hass: HomeAssistant, config: ConfigType) -> GrentonClu | None:
+    """
+    Find CLU serving the object of a platform entry.
+
+    The entry's `clu` key is used if present, otherwise every CLU is asked
+    whether it has the object. Groups are served by the CLU of their first
+    member.
+    """
+    clus: dict[str, GrentonClu] = hass.data[DOMAIN][CLUS]
+    object_id = config.get(CONF_OBJ_ID) or config[CONF_MEMBERS][0]
+
+    if (name := config.get(CONF_CLU)) is not None:
+        if name not in clus:
+            _LOGGER.error("Unknown CLU %s configured for object %s", name, object_id)
+        return clus.get(name)
+
+    if len(clus) == 1:
+        return next(iter(clus.values()))
+
+    found = await asyncio.gather(
+        *(clu.async_has_object(object_id) for clu in clus.values()),
+        return_exceptions=True,
+    )
+    for clu, has_object in zip(clus.values(), found, strict=True):
+        if has_object is True:
+            return clu
+
+    _LOGGER.error("Object %s not found on any CLU", object_id)
+    return None
+
+
+async def async_get_platform_entries(
+    hass: HomeAssistant, config: ConfigType, discovery_info: DiscoveryInfoType | None
+) -> tuple[GrentonClu | None, list[ConfigType]]:
+    """
+    Get CLU and entity configs of a platform setup.
+
+    Setups from discovery carry configs of all discovered objects of a CLU,
+    otherwise the platform entry itself is the only config.
+    """
+    if discovery_info is not None:
+        clus: dict[str, GrentonClu] = hass.data[DOMAIN][CLUS]
+        return clus[discovery_info[CONF_CLU]], discovery_info[DISCOVERED_ENTITIES]
+
+    return await async_get_clu(hass, config), [config]
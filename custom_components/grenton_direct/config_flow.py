@@ -0,0 +1,137 @@
+"""Config flow for grenton_direct integration."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlowWithConfigEntry,
+)
+from homeassistant.const import CONF_IP_ADDRESS, CONF_NAME, CONF_PORT
+from homeassistant.core import callback
+from pygrenton.clu_client import GrentonCipher
+from pygrenton.utils import get_host_ip
+
+from .const import (
+    CONF_ADAPTIVE_CONNECTION_LIMIT,
+    CONF_CACHE_MAX_AGE,
+    CONF_COMMAND_WINDOW,
+    CONF_IV,
+    CONF_KEY,
+    CONF_RESTORE_STATE,
+    DEFAULT_CACHE_MAX_AGE,
+    DEFAULT_COMMAND_WINDOW,
+    DOMAIN,
+)
+from .transport import CluTransport, Priority
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+USER_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_NAME): str,
+        vol.Required(CONF_IP_ADDRESS): str,
+        vol.Required(CONF_PORT, default=1234): int,
+        vol.Required(CONF_KEY): str,
+        vol.Required(CONF_IV): str,
+    }
+)
+
+
+async def _async_validate(hass: HomeAssistant, data: dict[str, Any]) -> str | None:
+    """Check the CLU responds to requests, returns error key if it does not."""
+    try:
+        cipher = GrentonCipher(data[CONF_KEY], data[CONF_IV])
+        cipher.encrypt(b"")
+    except ValueError:
+        return "invalid_cipher"
+
+    ip = data[CONF_IP_ADDRESS]
+    try:
+        local_ip = await hass.async_add_executor_job(get_host_ip, ip)
+        transport = CluTransport(ip, data[CONF_PORT], cipher, local_ip)
+        await transport.send_lua_request("1", priority=Priority.SERVICE)
+    except Exception:  # noqa: BLE001
+        # CLU ignores requests encrypted with a wrong key
+        return "cannot_connect"
+
+    return None
+
+
+class GrentonDirectConfigFlow(ConfigFlow, domain=DOMAIN):
+    """Set up a CLU from the UI."""
+
+    VERSION = 1
+
+    async def async_step_user(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Ask for CLU address and cipher."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            await self.async_set_unique_id(
+                f"{user_input[CONF_IP_ADDRESS]}:{user_input[CONF_PORT]}"
+            )
+            self._abort_if_unique_id_configured()
+
+            if (error := await _async_validate(self.hass, user_input)) is None:
+                return self.async_create_entry(
+                    title=user_input.get(CONF_NAME, user_input[CONF_IP_ADDRESS]),
+                    data=user_input,
+                )
+            errors["base"] = error
+
+        return self.async_show_form(
+            step_id="user",
+            data_schema=self.add_suggested_values_to_schema(USER_SCHEMA, user_input),
+            errors=errors,
+        )
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> GrentonOptionsFlow:
+        """Get options flow of an entry."""
+        return GrentonOptionsFlow(config_entry)
+
+
+class GrentonOptionsFlow(OptionsFlowWithConfigEntry):
+    """Options applied by reloading the entry."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Edit request pipeline options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        options = self.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_COMMAND_WINDOW,
+                        default=options.get(
+                            CONF_COMMAND_WINDOW, DEFAULT_COMMAND_WINDOW
+                        ),
+                    ): vol.Coerce(float),
+                    vol.Required(
+                        CONF_CACHE_MAX_AGE,
+                        default=options.get(CONF_CACHE_MAX_AGE, DEFAULT_CACHE_MAX_AGE),
+                    ): vol.Coerce(float),
+                    vol.Required(
+                        CONF_ADAPTIVE_CONNECTION_LIMIT,
+                        default=options.get(CONF_ADAPTIVE_CONNECTION_LIMIT, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_RESTORE_STATE,
+                        default=options.get(CONF_RESTORE_STATE, True),
+                    ): bool,
+                }
+            ),
+        )
@@ -9,7 +9,101 @@ CONF_CLIENT_IP = "client_ip"
 CONF_CLIENT_PORT = "client_port"
 CONF_OBJ_ID = "object_id"
 CONF_INDEX = "index"
+CONF_COMMAND_WINDOW = "command_window"
+CONF_CACHE_MAX_AGE = "cache_max_age"
+CONF_BATCH_ENTITY_SETUP = "batch_entity_setup"
+CONF_DEADBAND = "deadband"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_CLU = "clu"
+CONF_CONNECTION_LIMIT = "connection_limit"
+CONF_ADAPTIVE_CONNECTION_LIMIT = "adaptive_connection_limit"
+CONF_DISCOVERY = "discovery"
+CONF_RESTORE_STATE = "restore_state"
+CONF_TRAVEL_TIME = "travel_time"
+CONF_MEMBERS = "members"
+CONF_EVENTS = "events"
+CONF_SCRIPTS = "scripts"
+CONF_ARGS = "args"
+CONF_SOURCE = "source"
+CONF_AGGREGATE = "aggregate"
+CONF_STATISTIC = "statistic"
+CONF_WINDOW = "window"
+CONF_PUBLISH_INTERVAL = "publish_interval"
 
-GRENTON_API = "grenton_api"
+CLUS = "clus"
+ENTITY_BATCHES = "entity_batches"
+DISCOVERY_STORE = "discovery_store"
+STATE_STORE = "state_store"
+# CluClient and its update dispatcher by connection settings, kept for reloads
+CLIENTS = "clients"
+# ids of objects configured in platform entries of configuration.yaml
+CONFIGURED_OBJECTS = "configured_objects"
+
+# event fired on value changes of features subscribed in `events`
+EVENT_VALUE_CHANGED = "grenton_direct_value_changed"
+
+# dispatcher signal sent when state of an object's entity is written,
+# formatted with CLU name and object id
+SIGNAL_OBJECT_UPDATED = "grenton_direct_object_updated_{}_{}"
+
+# discovery info key with configs of entities created from discovered objects
+DISCOVERED_ENTITIES = "entities"
 
 CONNECTION_LIMIT = 4
+# upper bound of connection limit in adaptive mode
+MAX_CONNECTION_LIMIT = 16
+# connection slots only interactive entity commands may use
+INTERACTIVE_RESERVED_SLOTS = 1
+
+# maximum number of lua expressions packed into a single request
+LUA_BATCH_SIZE = 16
+
+# time in seconds during which commands are collected before being sent to CLU
+DEFAULT_COMMAND_WINDOW = 0.01
+
+# time in seconds after which cached feature value is no longer trusted
+DEFAULT_CACHE_MAX_AGE = 30.0
+
+# time in seconds without new platform entries after which entities are added
+ENTITY_BATCH_DELAY = 0.1
+
+# adaptive refresh: how often due features are checked and bounds of their
+# interval relative to the configured refresh hint
+REFRESH_TICK = 1.0
+REFRESH_MIN_FACTOR = 0.25
+REFRESH_MAX_FACTOR = 4.0
+
+# discovery: on-disk cache of parsed object lists and files fetched over tftp
+DISCOVERY_STORAGE_KEY = "grenton_direct.discovery"
+DISCOVERY_STORAGE_VERSION = 1
+TFTP_PORT = 69
+OM_FILE = "a:\\om.lua"
+
+# restored state: on-disk store of last known feature values and minimum time
+# in seconds between its writes
+STATE_STORAGE_KEY = "grenton_direct.states"
+STATE_STORAGE_VERSION = 1
+STATE_SAVE_DELAY = 10.0
+
+# aggregating sensors: samples kept per sensor and default window in seconds
+AGGREGATE_BUFFER_SIZE = 4096
+DEFAULT_AGGREGATE_WINDOW = 60.0
+
+# seconds an optimistic state waits for the CLU to report the written value
+OPTIMISTIC_CONFIRM_TIMEOUT = 5.0
+# difference of float values still matching an optimistic one
+OPTIMISTIC_TOLERANCE = 0.01
+
+# health supervision: seconds between probes of a healthy CLU, failed probes
+# after which its entities become unavailable and bounds of retry backoff
+HEALTH_CHECK_INTERVAL = 10.0
+HEALTH_FAILURES_UNAVAILABLE = 2
+HEALTH_RETRY_MIN = 1.0
+HEALTH_RETRY_MAX = 30.0
+
+# cover travel model: interval in seconds between position estimates while
+# moving, shortest move in percent used to learn travel time and weight of
+# a newly learned travel time
+COVER_ESTIMATE_INTERVAL = 0.5
+COVER_LEARN_MIN_TRAVEL = 10
+COVER_LEARN_WEIGHT = 0.3
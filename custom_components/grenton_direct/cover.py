@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+import logging
+import statistics
+import time
+from datetime import timedelta
 from typing import TYPE_CHECKING, Any, override
 
 import homeassistant.helpers.config_validation as cv
@@ -12,23 +16,44 @@ from homeassistant.components.cover import (
     CoverEntity,
     CoverEntityFeature,
 )
-from homeassistant.const import CONF_NAME
+from homeassistant.const import Platform
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_time_interval
+from pygrenton.clu_client import UpdateContext
 
+from .clu import async_get_platform_entries
 from .const import (
-    CONF_OBJ_ID,
-    DOMAIN,
-    GRENTON_API,
+    CONF_MEMBERS,
+    CONF_TRAVEL_TIME,
+    COVER_ESTIMATE_INTERVAL,
+    COVER_LEARN_MIN_TRAVEL,
+    COVER_LEARN_WEIGHT,
 )
-from .utils import GrentonObject
+from .group import PLATFORM_OPTIONS, GrentonGroup, platform_schema
+from .lua import LOOP_OBJECT, execute_expr
+from .utils import GrentonObject, add_grenton_entities, async_add_entry_entities
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+    from datetime import datetime
+
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
     from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
-    from pygrenton.clu_client import CluClient, UpdateContext
 
-PLATFORM_SCHEMA = cv.PLATFORM_SCHEMA.extend(
-    {vol.Required(CONF_OBJ_ID): cv.string, vol.Required(CONF_NAME): cv.string}
+    from .clu import GrentonClu, GrentonConfigEntry
+
+_LOGGER = logging.getLogger(__name__)
+
+PLATFORM_SCHEMA = platform_schema(
+    cv.PLATFORM_SCHEMA.extend(
+        {
+            **PLATFORM_OPTIONS,
+            vol.Optional(CONF_TRAVEL_TIME): vol.All(
+                vol.Coerce(float), vol.Range(min=0, min_included=False)
+            ),
+        }
+    )
 )
 
 
@@ -36,11 +61,127 @@ async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
     add_entities: AddEntitiesCallback,
-    discovery_info: DiscoveryInfoType | None = None,  # noqa: ARG001
+    discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Perform the setup for Cover devices."""
-    grenton_api = hass.data[DOMAIN][GRENTON_API]
-    add_entities([GrentonCover(grenton_api, config)], update_before_add=True)
+    clu, entries = await async_get_platform_entries(hass, config, discovery_info)
+    if clu is None:
+        return
+
+    if discovery_info is None and CONF_MEMBERS in config:
+        add_entities([GrentonCoverGroup(clu, config)])
+        return
+
+    add_grenton_entities(
+        hass,
+        Platform.COVER,
+        [GrentonCover(clu, entry) for entry in entries],
+        add_entities,
+    )
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: GrentonConfigEntry,
+    add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up covers of objects discovered on the CLU of a config entry."""
+    async_add_entry_entities(hass, entry, Platform.COVER, GrentonCover, add_entities)
+
+
+class TravelModel:
+    """
+    Estimates position of a moving cover.
+
+    Full travel time in each direction is learned from moves observed
+    between their start and the position reported after they stop.
+    """
+
+    OPENING = 1
+    CLOSING = -1
+
+    __slots__ = ("_base", "_move", "_travel_times", "direction", "target")
+
+    def __init__(self, travel_time: float | None) -> None:
+        """Initialize TravelModel."""
+        # direction -> seconds needed to travel from 0 to 100
+        self._travel_times: dict[int, float | None] = {
+            self.OPENING: travel_time,
+            self.CLOSING: travel_time,
+        }
+
+        self.direction = 0
+        self.target: float | None = None
+        # position and time estimates are made from
+        self._base: tuple[float, float] | None = None
+        # position and time of move start and time of its stop
+        self._move: tuple[float, float, float | None] | None = None
+
+    def start(self, direction: int, position: float | None, now: float) -> None:
+        """Cover started moving from given position."""
+        self.direction = direction
+        if position is None:
+            self._base = self._move = None
+            return
+
+        self._base = (position, now)
+        self._move = (position, now, None)
+
+    def sync(self, position: float, now: float) -> None:
+        """Position was reported while moving."""
+        if self.direction and self._base is not None:
+            self._base = (position, now)
+
+    def stop(self, now: float) -> None:
+        """Cover stopped, its final position is yet to be reported."""
+        self.direction = 0
+        self.target = None
+        self._base = None
+        if self._move is not None:
+            start_position, start, _ = self._move
+            self._move = (start_position, start, now)
+
+    def finish(self, position: float) -> None:
+        """Learn travel time from the final position of the last move."""
+        if self._move is None or self._move[2] is None:
+            return
+
+        start_position, start, stop = self._move
+        self._move = None
+
+        travel = position - start_position
+        if abs(travel) < COVER_LEARN_MIN_TRAVEL:
+            return
+
+        direction = self.OPENING if travel > 0 else self.CLOSING
+        travel_time = (stop - start) * 100 / abs(travel)
+        previous = self._travel_times[direction]
+        self._travel_times[direction] = (
+            travel_time
+            if previous is None
+            else previous + COVER_LEARN_WEIGHT * (travel_time - previous)
+        )
+
+    def estimate(self, now: float) -> float | None:
+        """Estimated position of moving cover, `None` if it can't be estimated."""
+        # until both are learned the other direction is a good guess
+        travel_time = self._travel_times.get(self.direction) or self._travel_times.get(
+            -self.direction
+        )
+        if self._base is None or not travel_time:
+            return None
+
+        position, start = self._base
+        position += self.direction * 100 * (now - start) / travel_time
+
+        low, high = 0.0, 100.0
+        if self.target is not None:
+            if self.direction == self.OPENING:
+                high = min(high, self.target)
+            else:
+                low = max(low, self.target)
+
+        return min(max(position, low), high)
 
 
 class GrentonCover(GrentonObject, CoverEntity):
@@ -57,9 +198,9 @@ class GrentonCover(GrentonObject, CoverEntity):
     ROLLER_SHUTER_STOP_METHOD = 3
     ROLLER_SHUTER_SET_POSITION_METHOD = 10
 
-    def __init__(self, grenton_api: CluClient, config: ConfigType) -> None:
+    def __init__(self, clu: GrentonClu, config: ConfigType) -> None:
         """Init GrentonCover."""
-        super().__init__(grenton_api, config)
+        super().__init__(clu, config)
 
         self._attr_device_class = CoverDeviceClass.BLIND
         self._attr_supported_features = (
@@ -69,41 +210,191 @@ class GrentonCover(GrentonObject, CoverEntity):
             | CoverEntityFeature.STOP
         )
 
+        self._travel = TravelModel(config.get(CONF_TRAVEL_TIME))
+        self._unsub_estimate: Callable[[], None] | None = None
+
         self.register_update_handler(
-            (self.ROLLER_SHUTER_STATE_INDEX, self.ROLLER_SHUTER_POSITION_INDEX),
-            self._update_handler,
+            self.ROLLER_SHUTER_STATE_INDEX, self._state_update_handler
+        )
+        self.register_update_handler(
+            self.ROLLER_SHUTER_POSITION_INDEX, self._position_update_handler
         )
 
-    def _update_handler(self, ctx: UpdateContext) -> None:
-        if ctx.index == self.ROLLER_SHUTER_STATE_INDEX:
-            self._attr_is_opening = ctx.value == self.ROLLER_SHUTER_STATE_OPENING
-            self._attr_is_closing = ctx.value == self.ROLLER_SHUTER_STATE_CLOSING
+    def _state_update_handler(self, ctx: UpdateContext) -> None:
+        self._attr_is_opening = ctx.value == self.ROLLER_SHUTER_STATE_OPENING
+        self._attr_is_closing = ctx.value == self.ROLLER_SHUTER_STATE_CLOSING
 
-        elif ctx.index == self.ROLLER_SHUTER_POSITION_INDEX:
-            self._attr_is_closed = ctx.value == 0
-            self._attr_current_cover_position = ctx.value
+        if self.hass is not None:
+            # handlers are called from client threads as well
+            self.hass.loop.call_soon_threadsafe(self._async_track_state)
 
         self.schedule_update_ha_state()
 
+    def _position_update_handler(self, ctx: UpdateContext) -> None:
+        self._attr_is_closed = ctx.value == 0
+        self._attr_current_cover_position = ctx.value
+
+        if self.hass is not None:
+            self.hass.loop.call_soon_threadsafe(self._async_track_position, ctx.value)
+
+        self.schedule_update_ha_state()
+
+    @callback
+    def _async_track_position(self, position: Any) -> None:
+        self._travel.sync(position, time.monotonic())
+        if not self._travel.direction:
+            self._travel.finish(position)
+
+    @callback
+    def _async_track_state(self) -> None:
+        now = time.monotonic()
+        if self._attr_is_opening or self._attr_is_closing:
+            direction = (
+                TravelModel.OPENING if self._attr_is_opening else TravelModel.CLOSING
+            )
+            if direction != self._travel.direction:
+                self._travel.start(direction, self._attr_current_cover_position, now)
+                self._start_estimates()
+            return
+
+        if self._travel.direction:
+            self._travel.stop(now)
+            self._stop_estimates()
+            # the only position read of a move, the CLU may not report it
+            self.hass.async_create_background_task(
+                self._async_read_position(), f"grenton_direct {self.object_id} stop"
+            )
+
+    def _start_estimates(self) -> None:
+        if self._unsub_estimate is None:
+            self._unsub_estimate = async_track_time_interval(
+                self.hass,
+                self._async_estimate,
+                timedelta(seconds=COVER_ESTIMATE_INTERVAL),
+                name=f"grenton_direct {self.object_id} position estimate",
+            )
+
+    def _stop_estimates(self) -> None:
+        if self._unsub_estimate is not None:
+            self._unsub_estimate()
+            self._unsub_estimate = None
+
+    @callback
+    def _async_estimate(self, _now: datetime) -> None:
+        position = self._travel.estimate(time.monotonic())
+        if position is None:
+            return
+
+        self._attr_current_cover_position = round(position)
+        self._attr_is_closed = self._attr_current_cover_position == 0
+        self.async_write_ha_state()
+
+    async def _async_read_position(self) -> None:
+        index = self.ROLLER_SHUTER_POSITION_INDEX
+        try:
+            position = await self.get_value(index)
+        except Exception:  # noqa: BLE001
+            _LOGGER.debug("Reading position of %s failed", self.object_id)
+            return
+
+        if position is None or self._travel.direction:
+            return
+
+        self._travel.finish(position)
+        # shown position may be an estimate, so write it even if unchanged
+        self.handle_update(UpdateContext(self.object_id, index, position))
+        self._attr_current_cover_position = position
+        self._attr_is_closed = position == 0
+        self.async_write_ha_state()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop position estimates."""
+        await super().async_will_remove_from_hass()
+        self._stop_estimates()
+
     @override
     async def async_open_cover(self, **kwargs: Any) -> None:
         """Open cover."""
         if not self._attr_is_opening:
+            self._travel.target = 100
             await self.execute_method(self.ROLLER_SHUTER_OPEN_METHOD, 0)
 
     @override
     async def async_close_cover(self, **kwargs: Any) -> None:
         """Close cover."""
         if not self._attr_is_closing:
+            self._travel.target = 0
             await self.execute_method(self.ROLLER_SHUTER_CLOSE_METHOD, 0)
 
     @override
     async def async_set_cover_position(self, **kwargs: Any) -> None:
         """Set cover position."""
         pos = kwargs[ATTR_POSITION]
+        self._travel.target = pos
         await self.execute_method(self.ROLLER_SHUTER_SET_POSITION_METHOD, pos)
 
     @override
     async def async_stop_cover(self, **kwargs: Any) -> None:
         """Stop cover."""
         await self.execute_method(self.ROLLER_SHUTER_STOP_METHOD, 0)
+
+
+class GrentonCoverGroup(GrentonGroup, CoverEntity):
+    """Group of grenton roller shutters moved together."""
+
+    def __init__(self, clu: GrentonClu, config: ConfigType) -> None:
+        """Init GrentonCoverGroup."""
+        super().__init__(clu, config)
+
+        self._attr_device_class = CoverDeviceClass.BLIND
+        self._attr_supported_features = (
+            CoverEntityFeature.OPEN
+            | CoverEntityFeature.CLOSE
+            | CoverEntityFeature.SET_POSITION
+            | CoverEntityFeature.STOP
+        )
+
+    @callback
+    def async_update_group_state(self) -> None:
+        """Position is mean of members, group is closed if all members are."""
+        members = self.members
+        positions = [
+            member.current_cover_position
+            for member in members
+            if member.current_cover_position is not None
+        ]
+        self._attr_current_cover_position = (
+            round(statistics.fmean(positions)) if positions else None
+        )
+
+        closed = [
+            member.is_closed for member in members if member.is_closed is not None
+        ]
+        self._attr_is_closed = all(closed) if closed else None
+        self._attr_is_opening = any(member.is_opening for member in members)
+        self._attr_is_closing = any(member.is_closing for member in members)
+
+    async def _execute(self, method: int, arg: Any = 0) -> None:
+        await self.execute_for_all(execute_expr(LOOP_OBJECT, method, arg))
+
+    @override
+    async def async_open_cover(self, **kwargs: Any) -> None:
+        """Open all covers."""
+        await self._execute(GrentonCover.ROLLER_SHUTER_OPEN_METHOD)
+
+    @override
+    async def async_close_cover(self, **kwargs: Any) -> None:
+        """Close all covers."""
+        await self._execute(GrentonCover.ROLLER_SHUTER_CLOSE_METHOD)
+
+    @override
+    async def async_set_cover_position(self, **kwargs: Any) -> None:
+        """Move all covers to position."""
+        await self._execute(
+            GrentonCover.ROLLER_SHUTER_SET_POSITION_METHOD, kwargs[ATTR_POSITION]
+        )
+
+    @override
+    async def async_stop_cover(self, **kwargs: Any) -> None:
+        """Stop all covers."""
+        await self._execute(GrentonCover.ROLLER_SHUTER_STOP_METHOD)
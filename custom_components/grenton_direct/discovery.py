@@ -0,0 +1,284 @@
+"""Discovery of CLU objects used by grenton_direct integration."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import logging
+import tempfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import tftpy
+from homeassistant.config import config_per_platform
+from homeassistant.const import (
+    CONF_DEVICE_CLASS,
+    CONF_NAME,
+    CONF_UNIT_OF_MEASUREMENT,
+    LIGHT_LUX,
+    PERCENTAGE,
+    Platform,
+    UnitOfTemperature,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.discovery import async_load_platform
+from homeassistant.helpers.storage import Store
+from pygrenton import objects_classes
+from pygrenton.parsers.om_parser import parse_om
+
+from .const import (
+    CONF_CLU,
+    CONF_INDEX,
+    CONF_OBJ_ID,
+    DISCOVERED_ENTITIES,
+    DISCOVERY_STORAGE_KEY,
+    DISCOVERY_STORAGE_VERSION,
+    DOMAIN,
+    OM_FILE,
+    TFTP_PORT,
+)
+from .transport import Priority
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
+
+    from .clu import GrentonClu
+
+_LOGGER = logging.getLogger(__name__)
+
+_TEMPERATURE = {
+    CONF_DEVICE_CLASS: "temperature",
+    CONF_UNIT_OF_MEASUREMENT: UnitOfTemperature.CELSIUS,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ObjectClass:
+    """How objects of a grenton class are exposed in Home Assistant."""
+
+    platform: Platform
+    # feature holding the value of sensors, cover position for roller shutters
+    value_index: int = 0
+    options: dict[str, Any] = field(default_factory=dict)
+
+
+OBJECT_CLASSES: dict[int, ObjectClass] = {
+    objects_classes.DOUT: ObjectClass(Platform.SWITCH),
+    objects_classes.DIMM: ObjectClass(Platform.LIGHT),
+    objects_classes.LEDRGBW: ObjectClass(Platform.LIGHT),
+    objects_classes.ROLLER_SH: ObjectClass(Platform.COVER, 7),
+    objects_classes.DIN: ObjectClass(Platform.BINARY_SENSOR),
+    objects_classes.ANALOGIN: ObjectClass(Platform.SENSOR),
+    objects_classes.TEMPERATURE_SENSOR: ObjectClass(Platform.SENSOR, 0, _TEMPERATURE),
+    objects_classes.ONEW_SENSOR: ObjectClass(Platform.SENSOR, 0, _TEMPERATURE),
+    objects_classes.HUMIDITY_SENSOR: ObjectClass(
+        Platform.SENSOR,
+        0,
+        {CONF_DEVICE_CLASS: "humidity", CONF_UNIT_OF_MEASUREMENT: PERCENTAGE},
+    ),
+    objects_classes.LIGHT_SENSOR_LUX: ObjectClass(
+        Platform.SENSOR,
+        0,
+        {CONF_DEVICE_CLASS: "illuminance", CONF_UNIT_OF_MEASUREMENT: LIGHT_LUX},
+    ),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class DiscoveredObject:
+    """Object found in the configuration of a CLU."""
+
+    object_id: str
+    name: str
+    object_class: int
+
+    @property
+    def platform(self) -> Platform | None:
+        """Platform exposing the object, `None` if its class is not supported."""
+        object_class = OBJECT_CLASSES.get(self.object_class)
+        return object_class.platform if object_class is not None else None
+
+    def entity_config(self, clu: GrentonClu) -> ConfigType:
+        """Platform entry equivalent to the object."""
+        object_class = OBJECT_CLASSES[self.object_class]
+        return {
+            CONF_OBJ_ID: self.object_id,
+            CONF_NAME: self.name,
+            CONF_CLU: clu.name,
+            CONF_INDEX: object_class.value_index,
+            **object_class.options,
+        }
+
+
+def parse_objects(om_lua: str) -> dict[str, DiscoveredObject]:
+    """Parse objects of CLU and its modules out of `om.lua`."""
+    om = parse_om(io.StringIO(om_lua))
+
+    objects = [
+        *om.clu_objects,
+        *(obj for module in om.module_objects.values() for obj in module),
+    ]
+    return {
+        obj.object_id: DiscoveredObject(
+            obj.object_id, om.getName(obj.object_id), obj.object_class
+        )
+        for obj in objects
+    }
+
+
+def _download_om(ip: str) -> bytes:
+    def skip_events(packet: Any) -> None:
+        # everything after object definitions is event handlers, a short
+        # packet makes the server consider transfer finished
+        if b"EventsFor" in packet.data:
+            packet.data = packet.data[:-1]
+
+    client = tftpy.TftpClient(ip, TFTP_PORT, options={"tsize": 0})
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "om.lua"
+        client.download(OM_FILE, str(path), packethook=skip_events)
+        return path.read_bytes()
+
+
+class DiscoveryStore:
+    """
+    On-disk cache of discovered objects.
+
+    Parsed object lists are kept by hash of the `om.lua` they come from and
+    every CLU points at the hash of its last downloaded file.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize DiscoveryStore."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, DISCOVERY_STORAGE_VERSION, DISCOVERY_STORAGE_KEY
+        )
+        self._data: dict[str, Any] | None = None
+        self._lock = asyncio.Lock()
+
+    async def _async_data(self) -> dict[str, Any]:
+        if self._data is None:
+            self._data = await self._store.async_load() or {"clus": {}, "indexes": {}}
+        return self._data
+
+    async def async_get(self, clu_name: str) -> dict[str, DiscoveredObject] | None:
+        """Last discovered objects of a CLU."""
+        data = await self._async_data()
+        digest = data["clus"].get(clu_name)
+        return await self.async_get_index(digest) if digest is not None else None
+
+    async def async_get_index(self, digest: str) -> dict[str, DiscoveredObject] | None:
+        """Objects parsed from the file with given hash."""
+        data = await self._async_data()
+        if (index := data["indexes"].get(digest)) is None:
+            return None
+        return {obj["object_id"]: DiscoveredObject(**obj) for obj in index}
+
+    async def async_set(
+        self, clu_name: str, digest: str, objects: dict[str, DiscoveredObject]
+    ) -> None:
+        """Store objects discovered on a CLU."""
+        async with self._lock:
+            data = await self._async_data()
+            data["clus"][clu_name] = digest
+            data["indexes"][digest] = [asdict(obj) for obj in objects.values()]
+
+            # drop indexes no CLU points at anymore
+            used = set(data["clus"].values())
+            data["indexes"] = {k: v for k, v in data["indexes"].items() if k in used}
+
+            await self._store.async_save(data)
+
+
+async def async_discover(
+    hass: HomeAssistant, clu: GrentonClu, store: DiscoveryStore, *, force: bool
+) -> dict[str, DiscoveredObject]:
+    """
+    Get objects of a CLU.
+
+    Unless `force` is set objects cached by a previous discovery are used
+    without contacting the CLU.
+    """
+    if not force and (objects := await store.async_get(clu.name)) is not None:
+        _LOGGER.debug("Using %d cached objects of %s", len(objects), clu.name)
+        return objects
+
+    try:
+        await clu.transport.send_request("req_start_ftp", Priority.SERVICE)
+        try:
+            om_lua = await hass.async_add_executor_job(_download_om, clu.client.clu_ip)
+        finally:
+            await clu.transport.send_request("req_tftp_stop", Priority.SERVICE)
+    except Exception as err:
+        msg = f"Downloading configuration of {clu.name} failed: {err}"
+        raise HomeAssistantError(msg) from err
+
+    digest = hashlib.sha256(om_lua).hexdigest()
+    if (objects := await store.async_get_index(digest)) is None:
+        objects = await hass.async_add_executor_job(
+            parse_objects, om_lua.decode(errors="replace")
+        )
+
+    await store.async_set(clu.name, digest, objects)
+    return objects
+
+
+def configured_object_ids(config: ConfigType) -> set[str]:
+    """Ids of objects configured manually in platform entries."""
+    return {
+        entry[CONF_OBJ_ID]
+        for platform in Platform
+        for name, entry in config_per_platform(config, platform)
+        if name == DOMAIN and CONF_OBJ_ID in entry
+    }
+
+
+def entity_configs(
+    clu: GrentonClu, objects: dict[str, DiscoveredObject], skipped: set[str]
+) -> dict[Platform, list[ConfigType]]:
+    """Configs of entities of discovered objects by platform."""
+    by_platform: dict[Platform, list[ConfigType]] = {}
+    for obj in objects.values():
+        if obj.object_id in skipped or obj.platform is None:
+            continue
+        by_platform.setdefault(obj.platform, []).append(obj.entity_config(clu))
+
+    return by_platform
+
+
+async def async_add_discovered(
+    hass: HomeAssistant,
+    clu: GrentonClu,
+    objects: dict[str, DiscoveredObject],
+    config: ConfigType,
+) -> list[str]:
+    """
+    Create entities for discovered objects not known before.
+
+    Objects configured manually are left to their platform entries.
+    Returns ids of objects entities were created for.
+    """
+    skipped = configured_object_ids(config) | clu.objects.keys()
+    clu.objects.update(objects)
+    by_platform = entity_configs(clu, objects, skipped)
+
+    if clu.entry_id is not None:
+        # entities of config entries are created by their platforms
+        if by_platform:
+            hass.config_entries.async_schedule_reload(clu.entry_id)
+    else:
+        for platform, entities in by_platform.items():
+            await async_load_platform(
+                hass,
+                platform,
+                DOMAIN,
+                {CONF_CLU: clu.name, DISCOVERED_ENTITIES: entities},
+                config,
+            )
+
+    return [
+        entity[CONF_OBJ_ID] for entities in by_platform.values() for entity in entities
+    ]
@@ -0,0 +1,132 @@
+"""Value change events used by grenton_direct integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any
+
+from .const import CONF_CLU, CONF_INDEX, CONF_OBJ_ID, EVENT_VALUE_CHANGED
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
+    from pygrenton.clu_client import CluClient, UpdateContext
+
+    from .clu import GrentonClu
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UpdateDispatcher:
+    """
+    Fans value changes of CLU features out to any number of handlers.
+
+    `CluClient` keeps a single handler per feature, so every feature is
+    registered with the client once and its notifications are passed to all
+    handlers added for it. Client registrations outlive handlers, so
+    entities added again after a reload cost no requests.
+    """
+
+    def __init__(self, client: CluClient) -> None:
+        """Initialize UpdateDispatcher."""
+        self.client = client
+        self._handlers: dict[
+            tuple[str, int], list[Callable[[UpdateContext], None]]
+        ] = {}
+        # features registered with the client
+        self._registered: set[tuple[str, int]] = set()
+        self._lock = asyncio.Lock()
+
+    async def async_register(
+        self,
+        object_id: str,
+        indexes: Iterable[int],
+        handler: Callable[[UpdateContext], None],
+    ) -> None:
+        """Call handler on value changes of features of an object."""
+        indexes = tuple(indexes)
+        async with self._lock:
+            for index in indexes:
+                self._handlers.setdefault((object_id, index), []).append(handler)
+
+            new = [i for i in indexes if (object_id, i) not in self._registered]
+            if not new:
+                return
+
+            # the client keeps features whose page request failed and
+            # registers them with the next page refresh, so do handlers here
+            self._registered.update((object_id, index) for index in new)
+            # client registration blocks on CLU responses
+            await self.client.register_value_change_handler_async(
+                object_id, new, self._dispatch
+            )
+
+    def unregister(
+        self,
+        object_id: str,
+        indexes: Iterable[int],
+        handler: Callable[[UpdateContext], None],
+    ) -> None:
+        """Stop calling handler, features stay registered with the client."""
+        for index in indexes:
+            handlers = self._handlers.get((object_id, index), [])
+            if handler in handlers:
+                handlers.remove(handler)
+            if not handlers:
+                self._handlers.pop((object_id, index), None)
+
+    def _refresh_registrations(self) -> None:
+        # CluClient only registers pages again on its periodic refresh
+        client = self.client
+        with client._client_registration_lock:  # noqa: SLF001
+            for page in list(client._client_pages.values()):  # noqa: SLF001
+                client._refresh_page(page)  # noqa: SLF001
+
+    async def async_refresh_registrations(self) -> None:
+        """Register all features with the CLU again, e.g. after it restarted."""
+        await asyncio.to_thread(self._refresh_registrations)
+
+    def _dispatch(self, ctx: UpdateContext) -> None:
+        # called from client threads
+        for handler in tuple(self._handlers.get((ctx.object_id, ctx.index), ())):
+            handler(ctx)
+
+
+async def async_subscribe_events(
+    hass: HomeAssistant, clu: GrentonClu, subscriptions: list[ConfigType]
+) -> None:
+    """
+    Fire `grenton_direct_value_changed` events for subscribed features.
+
+    The first value of a feature, reported when the subscription is made,
+    is only remembered, as are values repeated by periodic client refresh.
+    """
+    last_values: dict[tuple[str, int], Any] = {}
+
+    def fire(ctx: UpdateContext) -> None:
+        feature = (ctx.object_id, ctx.index)
+        known = feature in last_values
+        previous = last_values.get(feature)
+        last_values[feature] = ctx.value
+        if not known or previous == ctx.value:
+            return
+
+        hass.bus.fire(
+            EVENT_VALUE_CHANGED,
+            {
+                CONF_CLU: clu.name,
+                CONF_OBJ_ID: ctx.object_id,
+                CONF_INDEX: ctx.index,
+                "value": ctx.value,
+            },
+        )
+
+    for subscription in subscriptions:
+        object_id = subscription[CONF_OBJ_ID]
+        try:
+            await clu.updates.async_register(object_id, subscription[CONF_INDEX], fire)
+        except Exception:
+            _LOGGER.exception("Subscribing to events of %s failed", object_id)
@@ -0,0 +1,129 @@
+"""Groups of grenton objects used by grenton_direct integration."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any
+
+import homeassistant.helpers.config_validation as cv
+import voluptuous as vol
+from homeassistant.const import ATTR_ENTITY_ID, CONF_NAME
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import CONF_CLU, CONF_MEMBERS, CONF_OBJ_ID, DOMAIN, SIGNAL_OBJECT_UPDATED
+from .lua import foreach_expr
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from homeassistant.helpers.typing import ConfigType
+
+    from .clu import GrentonClu
+    from .utils import GrentonObject
+
+# platform entry options shared by objects and groups
+PLATFORM_OPTIONS = {
+    vol.Exclusive(CONF_OBJ_ID, "object"): cv.string,
+    vol.Exclusive(CONF_MEMBERS, "object"): vol.All(
+        cv.ensure_list, [cv.string], vol.Length(min=1)
+    ),
+    vol.Required(CONF_NAME): cv.string,
+    vol.Optional(CONF_CLU): cv.string,
+}
+
+
+def platform_schema(schema: vol.Schema, *object_options: str) -> vol.All:
+    """
+    Require either an object or members of a group in platform entries.
+
+    Options in `object_options` are only accepted for objects.
+    """
+    return vol.All(
+        cv.has_at_least_one_key(CONF_OBJ_ID, CONF_MEMBERS),
+        *(cv.has_at_most_one_key(CONF_MEMBERS, option) for option in object_options),
+        schema,
+    )
+
+
+class GrentonGroup(ABC):
+    """
+    Entity controlling several grenton objects of a CLU at once.
+
+    Commands are sent as a single lua loop over the members while their
+    states are taken from the members' own entities.
+    """
+
+    _attr_should_poll = False
+
+    def __init__(self, clu: GrentonClu, config: ConfigType) -> None:
+        """Initialize GrentonGroup."""
+        self._clu = clu
+        self._member_ids: list[str] = config[CONF_MEMBERS]
+
+        self._attr_name = config[CONF_NAME]
+        self._attr_unique_id = f"{DOMAIN}.group." + ".".join(self._member_ids)
+
+    @property
+    def available(self) -> bool:
+        """Group is unavailable while its CLU does not respond."""
+        return self._clu.available
+
+    @property
+    def members(self) -> list[GrentonObject]:
+        """Entities of members added to hass."""
+        entities = self._clu.entities
+        return [
+            entities[object_id]
+            for object_id in self._member_ids
+            if object_id in entities
+        ]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Entity ids of members."""
+        return {ATTR_ENTITY_ID: [member.entity_id for member in self.members]}
+
+    async def async_added_to_hass(self) -> None:
+        """Follow state changes of members."""
+        await super().async_added_to_hass()
+        for object_id in self._member_ids:
+            self.async_on_remove(
+                async_dispatcher_connect(
+                    self.hass,
+                    SIGNAL_OBJECT_UPDATED.format(self._clu.name, object_id),
+                    self._async_member_updated,
+                )
+            )
+
+        self.async_update_group_state()
+
+    @callback
+    def _async_member_updated(self) -> None:
+        self.async_update_group_state()
+        self.async_write_ha_state()
+
+    @callback
+    @abstractmethod
+    def async_update_group_state(self) -> None:
+        """Derive state of the group from states of its members."""
+
+    async def execute_for_members(
+        self, loops: Iterable[tuple[Iterable[str], str]]
+    ) -> None:
+        """
+        Run statements for members in a single request.
+
+        Each loop is a list of member ids and a lua statement, see
+        `foreach_expr`.
+        """
+        with self._clu.metrics.measure("group", self.entity_id):
+            await self._clu.scheduler.execute(foreach_expr(loops))
+
+        # members may have cached values the loop just changed
+        for member in self.members:
+            member.invalidate_cache()
+
+    async def execute_for_all(self, statement: str) -> None:
+        """Run a lua statement for every member in a single request."""
+        await self.execute_for_members([(self._member_ids, statement)])
@@ -0,0 +1,128 @@
+"""Connection health supervision used by grenton_direct integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import re
+import time
+from typing import TYPE_CHECKING
+
+from homeassistant.core import callback
+
+from .const import (
+    HEALTH_CHECK_INTERVAL,
+    HEALTH_FAILURES_UNAVAILABLE,
+    HEALTH_RETRY_MAX,
+    HEALTH_RETRY_MIN,
+)
+from .lua import marker_expr
+from .transport import Priority
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .clu import GrentonClu
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class HealthSupervisor:
+    """
+    Watches connection to a CLU and recovers from its restarts.
+
+    Every probe leaves a marker in lua state of the CLU. A missing marker
+    means the CLU restarted and lost client registrations, so features are
+    registered again right away. While probes fail entities of the CLU are
+    unavailable and probes are retried with exponential backoff.
+
+    Each successful probe confirms that registered features are still
+    reported, which keeps their cached values fresh.
+    """
+
+    def __init__(self, hass: HomeAssistant, clu: GrentonClu) -> None:
+        """Initialize HealthSupervisor."""
+        self._hass = hass
+        self._clu = clu
+        self._marker = "grenton_direct_" + re.sub(r"\W", "_", clu.client.client_ip)
+        self._task: asyncio.Task | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start probing the CLU."""
+        self._task = self._hass.async_create_background_task(
+            self._async_run(), f"grenton_direct health {self._clu.name}"
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop probing the CLU."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _async_probe(self) -> bool:
+        """Check the CLU responds, returns whether it kept the marker."""
+        return (
+            await self._clu.transport.send_lua_request(
+                marker_expr(self._marker), priority=Priority.SERVICE
+            )
+            is True
+        )
+
+    async def _async_run(self) -> None:
+        failures = 0
+        # the marker is missing until the first successful probe leaves it
+        first = True
+        delay = 0.0
+
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                marked = await self._async_probe()
+                restarted = not first and not marked
+                if failures or restarted:
+                    await self._async_recover(restarted=restarted)
+            except Exception as err:  # noqa: BLE001
+                failures += 1
+                # changes may be lost while the CLU does not respond
+                self._clu.registrations_confirmed = -math.inf
+                _LOGGER.debug("Probe of %s failed: %s", self._clu.name, err)
+                if failures == HEALTH_FAILURES_UNAVAILABLE:
+                    _LOGGER.warning("Lost connection to %s", self._clu.name)
+                    self._async_set_available(available=False)
+
+                delay = min(HEALTH_RETRY_MIN * 2 ** (failures - 1), HEALTH_RETRY_MAX)
+                continue
+
+            first = False
+            failures = 0
+            self._clu.registrations_confirmed = time.monotonic()
+            delay = HEALTH_CHECK_INTERVAL
+
+    async def _async_recover(self, *, restarted: bool) -> None:
+        if restarted:
+            _LOGGER.info("%s restarted, registering features again", self._clu.name)
+            self._clu.scripts.invalidate()
+        await self._clu.updates.async_refresh_registrations()
+        # values changed while the CLU did not respond are not reported
+        for entity in list(self._clu.entities.values()):
+            entity.invalidate_cache()
+        await asyncio.gather(
+            *(entity.async_update() for entity in list(self._clu.entities.values())),
+            return_exceptions=True,
+        )
+
+        if not self._clu.available:
+            _LOGGER.info("Connection to %s restored", self._clu.name)
+            self._async_set_available(available=True)
+
+    @callback
+    def _async_set_available(self, *, available: bool) -> None:
+        self._clu.available = available
+        # groups follow their members
+        for entity in list(self._clu.entities.values()):
+            if not available:
+                entity.invalidate_cache()
+            entity.async_write_ha_state()
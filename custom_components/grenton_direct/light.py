@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import asyncio
+import statistics
+from functools import lru_cache
 from typing import TYPE_CHECKING, Any, override
 
 import homeassistant.helpers.config_validation as cv
@@ -10,47 +12,106 @@ import voluptuous as vol
 from homeassistant.components.light import (
     ATTR_BRIGHTNESS,
     ATTR_RGBW_COLOR,
+    ATTR_TRANSITION,
     ColorMode,
     LightEntity,
+    LightEntityFeature,
 )
-from homeassistant.const import CONF_NAME
+from homeassistant.const import CONF_OPTIMISTIC, Platform
+from homeassistant.core import callback
+from pygrenton import objects_classes
 
-from .const import (
-    CONF_OBJ_ID,
-    DOMAIN,
-    GRENTON_API,
-)
-from .utils import GrentonObject
+from .clu import async_get_platform_entries
+from .const import CONF_MEMBERS, CONF_OBJ_ID
+from .group import PLATFORM_OPTIONS, GrentonGroup, platform_schema
+from .lua import LOOP_OBJECT, execute_expr, set_expr
+from .utils import GrentonObject, add_grenton_entities, async_add_entry_entities
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
     from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
-    from pygrenton.clu_client import CluClient, UpdateContext
+    from pygrenton.clu_client import UpdateContext
+
+    from .clu import GrentonClu, GrentonConfigEntry
 
-PLATFORM_SCHEMA = cv.PLATFORM_SCHEMA.extend(
-    {vol.Required(CONF_OBJ_ID): cv.string, vol.Required(CONF_NAME): cv.string}
+PLATFORM_SCHEMA = platform_schema(
+    cv.PLATFORM_SCHEMA.extend(PLATFORM_OPTIONS).extend(
+        {vol.Optional(CONF_OPTIMISTIC): bool}
+    ),
+    CONF_OPTIMISTIC,
 )
 
+# level dimmers and rgbw modules switch on to
+SWITCH_ON_LEVEL = 1.0
+
 
 async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
     add_entities: AddEntitiesCallback,
-    discovery_info: DiscoveryInfoType | None = None,  # noqa: ARG001
+    discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Perform the setup for Light devices."""
-    grenton_api = hass.data[DOMAIN][GRENTON_API]
+    clu, entries = await async_get_platform_entries(hass, config, discovery_info)
+    if clu is None:
+        return
+
+    if discovery_info is None and CONF_MEMBERS in config:
+        add_entities([GrentonLightGroup(clu, config)])
+        return
+
+    add_grenton_entities(
+        hass,
+        Platform.LIGHT,
+        [_create_light(clu, entry) for entry in entries],
+        add_entities,
+    )
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: GrentonConfigEntry,
+    add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up lights of objects discovered on the CLU of a config entry."""
+    async_add_entry_entities(hass, entry, Platform.LIGHT, _create_light, add_entities)
+
+
+def _create_light(clu: GrentonClu, config: ConfigType) -> GrentonObject:
+    return _light_class(clu, config[CONF_OBJ_ID])(clu, config)
 
-    device_prefix = config[CONF_OBJ_ID][:3]
-    if device_prefix == "LED":
-        entity = GrentonRGBW(grenton_api, config)
-    elif device_prefix == "DIM":
-        entity = GrentonDimmer(grenton_api, config)
+
+def _light_class(clu: GrentonClu, object_id: str) -> type[GrentonLightObject]:
+    # class of a discovered object, otherwise guess it from the id prefix
+    if (obj := clu.objects.get(object_id)) is not None:
+        object_class = obj.object_class
+    elif object_id.startswith("LED"):
+        object_class = objects_classes.LEDRGBW
+    elif object_id.startswith("DIM"):
+        object_class = objects_classes.DIMM
     else:
-        entity = GrentonLight(grenton_api, config)
+        object_class = objects_classes.DOUT
+
+    if object_class == objects_classes.LEDRGBW:
+        return GrentonRGBW
+    if object_class == objects_classes.DIMM:
+        return GrentonDimmer
+    return GrentonLight
+
+
+# modules report a handful of distinct colors, so they are decoded once
+@lru_cache(maxsize=256)
+def _hex_to_rgb(hex_color: str) -> tuple[int, int, int]:
+    return (
+        int(hex_color[1:3], base=16),
+        int(hex_color[3:5], base=16),
+        int(hex_color[5:7], base=16),
+    )
 
-    add_entities([entity], update_before_add=True)
+
+def _rgb_to_hex(rgb: tuple[int, ...]) -> str:
+    return "#" + "".join(f"{c:02x}" for c in rgb)
 
 
 class GrentonLight(GrentonObject, LightEntity):
@@ -58,9 +119,9 @@ class GrentonLight(GrentonObject, LightEntity):
 
     RELAY_STATE_INDEX = 0
 
-    def __init__(self, grenton_api: CluClient, config: ConfigType) -> None:
+    def __init__(self, clu: GrentonClu, config: ConfigType) -> None:
         """Init GrentonLight."""
-        super().__init__(grenton_api, config)
+        super().__init__(clu, config)
 
         self._attr_color_mode = ColorMode.ONOFF
         self._attr_supported_color_modes = {ColorMode.ONOFF}
@@ -73,6 +134,16 @@ class GrentonLight(GrentonObject, LightEntity):
 
         self.schedule_update_ha_state()
 
+    @classmethod
+    def turn_on_statement(cls, object_id: str, brightness: int | None) -> str:  # noqa: ARG003
+        """Lua statement turning the light on, used by groups."""
+        return set_expr(object_id, cls.RELAY_STATE_INDEX, 1)
+
+    @classmethod
+    def turn_off_statement(cls, object_id: str) -> str:
+        """Lua statement turning the light off, used by groups."""
+        return set_expr(object_id, cls.RELAY_STATE_INDEX, 0)
+
     @override
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on light."""
@@ -88,15 +159,18 @@ class GrentonDimmer(GrentonObject, LightEntity):
     """Grenton Dimmer module representation."""
 
     BRIGHTNESS_INDEX = 0
+    # ramp time in milliseconds used by the module when changing brightness
+    RAMP_TIME_INDEX = 4
     DIMMER_SWITCH_ON_INDEX = 2
     DIMMER_SWITCH_OFF_INDEX = 3
 
-    def __init__(self, grenton_api: CluClient, config: ConfigType) -> None:
+    def __init__(self, clu: GrentonClu, config: ConfigType) -> None:
         """Init GrentonDimmer."""
-        super().__init__(grenton_api, config)
+        super().__init__(clu, config)
 
         self._attr_color_mode = ColorMode.BRIGHTNESS
         self._attr_supported_color_modes = {ColorMode.BRIGHTNESS}
+        self._attr_supported_features = LightEntityFeature.TRANSITION
 
         self.register_update_handler(self.BRIGHTNESS_INDEX, self._update_handler)
 
@@ -106,18 +180,51 @@ class GrentonDimmer(GrentonObject, LightEntity):
 
         self.schedule_update_ha_state()
 
+    @classmethod
+    def turn_on_statement(cls, object_id: str, brightness: int | None) -> str:
+        """Lua statement turning the dimmer on, used by groups."""
+        if brightness:
+            return set_expr(object_id, cls.BRIGHTNESS_INDEX, brightness / 255)
+        return execute_expr(object_id, cls.DIMMER_SWITCH_ON_INDEX, 0)
+
+    @classmethod
+    def turn_off_statement(cls, object_id: str) -> str:
+        """Lua statement turning the dimmer off, used by groups."""
+        return execute_expr(object_id, cls.DIMMER_SWITCH_OFF_INDEX, 0)
+
     @override
     async def async_turn_on(self, **kwargs: Any) -> None:
         brightness = kwargs.get(ATTR_BRIGHTNESS)
 
-        if brightness:
+        if transition := kwargs.get(ATTR_TRANSITION):
+            await self.execute_ramped(
+                self.RAMP_TIME_INDEX,
+                transition,
+                [self.turn_on_statement(self.object_id, brightness)],
+            )
+        elif brightness:
             await self.set_value(self.BRIGHTNESS_INDEX, brightness / 255)
         else:
-            await self.execute_method(self.DIMMER_SWITCH_ON_INDEX, 0)
+            await self.execute_optimistic(
+                self.BRIGHTNESS_INDEX,
+                SWITCH_ON_LEVEL,
+                self.execute_method(self.DIMMER_SWITCH_ON_INDEX, 0),
+            )
 
     @override
     async def async_turn_off(self, **kwargs: Any) -> None:
-        await self.execute_method(self.DIMMER_SWITCH_OFF_INDEX, 0)
+        if transition := kwargs.get(ATTR_TRANSITION):
+            await self.execute_ramped(
+                self.RAMP_TIME_INDEX,
+                transition,
+                [self.turn_off_statement(self.object_id)],
+            )
+        else:
+            await self.execute_optimistic(
+                self.BRIGHTNESS_INDEX,
+                0.0,
+                self.execute_method(self.DIMMER_SWITCH_OFF_INDEX, 0),
+            )
 
 
 class GrentonRGBW(GrentonObject, LightEntity):
@@ -129,6 +236,8 @@ class GrentonRGBW(GrentonObject, LightEntity):
     COLOR_GREEN_INDEX = 4
     COLOR_BLUE_INDEX = 5
     HEX_COLOR_INDEX = 6
+    # ramp time in milliseconds used by the module when changing colors
+    RAMP_TIME_INDEX = 11
     COLOR_WHITE_INDEX = 15
 
     # method indexes
@@ -140,59 +249,175 @@ class GrentonRGBW(GrentonObject, LightEntity):
     SWITCH_OFF_INDEX = 10
     SET_WHITE_INDEX = 12
 
-    def __init__(self, grenton_api: CluClient, config: ConfigType) -> None:
+    def __init__(self, clu: GrentonClu, config: ConfigType) -> None:
         """Init GrentonRGBW."""
-        super().__init__(grenton_api, config)
+        super().__init__(clu, config)
 
         self._attr_color_mode = ColorMode.RGBW
         self._attr_supported_color_modes = {ColorMode.RGBW}
+        self._attr_supported_features = LightEntityFeature.TRANSITION
 
         self._attr_rgbw_color = (0, 0, 0, 0)
 
-        features = (self.HEX_COLOR_INDEX, self.COLOR_WHITE_INDEX, self.BRIGHTNESS_INDEX)
-        self.register_update_handler(features, self._update_handler)
+        self.register_update_handler(self.HEX_COLOR_INDEX, self._color_update_handler)
+        self.register_update_handler(self.COLOR_WHITE_INDEX, self._white_update_handler)
+        self.register_update_handler(
+            self.BRIGHTNESS_INDEX, self._brightness_update_handler
+        )
 
-    def _update_handler(self, ctx: UpdateContext) -> None:
-        r, g, b, w = self._attr_rgbw_color or (0, 0, 0, 0)
-
-        if ctx.index == self.HEX_COLOR_INDEX:
-            hex_color = ctx.value
-            r = int(hex_color[1:3], base=16)
-            g = int(hex_color[3:5], base=16)
-            b = int(hex_color[5:7], base=16)
-
-            self._attr_rgbw_color = (r, g, b, w)
-        elif ctx.index == self.COLOR_WHITE_INDEX:
-            self._attr_rgbw_color = (r, g, b, ctx.value or 0)
-        elif ctx.index == self.BRIGHTNESS_INDEX:
-            self._attr_brightness = int(ctx.value * 255)
-            self._attr_is_on = ctx.value > 0
-        else:
-            return
+    def _color_update_handler(self, ctx: UpdateContext) -> None:
+        w = self._attr_rgbw_color[3] if self._attr_rgbw_color else 0
+        self._attr_rgbw_color = (*_hex_to_rgb(ctx.value), w)
+        self.schedule_update_ha_state()
+
+    def _white_update_handler(self, ctx: UpdateContext) -> None:
+        r, g, b, _ = self._attr_rgbw_color or (0, 0, 0, 0)
+        self._attr_rgbw_color = (r, g, b, ctx.value or 0)
+        self.schedule_update_ha_state()
 
+    def _brightness_update_handler(self, ctx: UpdateContext) -> None:
+        self._attr_brightness = int(ctx.value * 255)
+        self._attr_is_on = ctx.value > 0
         self.schedule_update_ha_state()
 
+    @classmethod
+    def turn_on_statement(cls, object_id: str, brightness: int | None) -> str:
+        """Lua statement turning the module on, used by groups."""
+        if brightness:
+            return execute_expr(object_id, cls.SET_BRIGHTNESS_INDEX, brightness / 255)
+        return execute_expr(object_id, cls.SWITCH_ON_INDEX, 0)
+
+    @classmethod
+    def turn_off_statement(cls, object_id: str) -> str:
+        """Lua statement turning the module off, used by groups."""
+        return execute_expr(object_id, cls.SWITCH_OFF_INDEX, 0)
+
+    def _color_statements(self, color: tuple[int, int, int, int]) -> list[str]:
+        return [
+            execute_expr(self.object_id, index, value)
+            for index, value in zip(
+                (
+                    self.SET_RED_INDEX,
+                    self.SET_GREEN_INDEX,
+                    self.SET_BLUE_INDEX,
+                    self.SET_WHITE_INDEX,
+                ),
+                color,
+                strict=True,
+            )
+        ]
+
     @override
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Set RGBW color."""
         color = kwargs.get(ATTR_RGBW_COLOR)
         brightness = kwargs.get(ATTR_BRIGHTNESS)
 
-        if color:
+        if transition := kwargs.get(ATTR_TRANSITION):
+            statements = self._color_statements(color) if color else []
+            if brightness or not color:
+                statements.append(self.turn_on_statement(self.object_id, brightness))
+            await self.execute_ramped(self.RAMP_TIME_INDEX, transition, statements)
+
+        elif color:
+            # commands are sent in one request by the scheduler
             await asyncio.gather(
-                self.execute_method(self.SET_RED_INDEX, color[0]),
-                self.execute_method(self.SET_GREEN_INDEX, color[1]),
-                self.execute_method(self.SET_BLUE_INDEX, color[2]),
-                self.execute_method(self.SET_WHITE_INDEX, color[3]),
+                self.execute_optimistic(
+                    self.HEX_COLOR_INDEX,
+                    _rgb_to_hex(color[:3]),
+                    self.execute_methods(
+                        (self.SET_RED_INDEX, color[0]),
+                        (self.SET_GREEN_INDEX, color[1]),
+                        (self.SET_BLUE_INDEX, color[2]),
+                    ),
+                ),
+                self.execute_optimistic(
+                    self.COLOR_WHITE_INDEX,
+                    color[3],
+                    self.execute_method(self.SET_WHITE_INDEX, color[3]),
+                ),
             )
 
         elif brightness:
-            await self.execute_method(self.BRIGHTNESS_INDEX, brightness / 255)
+            await self.execute_optimistic(
+                self.BRIGHTNESS_INDEX,
+                brightness / 255,
+                self.execute_method(self.SET_BRIGHTNESS_INDEX, brightness / 255),
+            )
 
         else:
-            await self.execute_method(self.SWITCH_ON_INDEX, 0)
+            await self.execute_optimistic(
+                self.BRIGHTNESS_INDEX,
+                SWITCH_ON_LEVEL,
+                self.execute_method(self.SWITCH_ON_INDEX, 0),
+            )
 
     @override
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off light."""
-        await self.execute_method(self.SWITCH_OFF_INDEX, 0)
+        if transition := kwargs.get(ATTR_TRANSITION):
+            await self.execute_ramped(
+                self.RAMP_TIME_INDEX,
+                transition,
+                [self.turn_off_statement(self.object_id)],
+            )
+        else:
+            await self.execute_optimistic(
+                self.BRIGHTNESS_INDEX,
+                0.0,
+                self.execute_method(self.SWITCH_OFF_INDEX, 0),
+            )
+
+
+GrentonLightObject = GrentonLight | GrentonDimmer | GrentonRGBW
+
+
+class GrentonLightGroup(GrentonGroup, LightEntity):
+    """Group of grenton lights of any kind switched together."""
+
+    def __init__(self, clu: GrentonClu, config: ConfigType) -> None:
+        """Init GrentonLightGroup."""
+        super().__init__(clu, config)
+
+        # member ids by the light class controlling them
+        self._member_classes: dict[type[GrentonLightObject], list[str]] = {}
+        for object_id in self._member_ids:
+            light_class = _light_class(clu, object_id)
+            self._member_classes.setdefault(light_class, []).append(object_id)
+
+        dimmable = any(cls is not GrentonLight for cls in self._member_classes)
+        self._attr_color_mode = ColorMode.BRIGHTNESS if dimmable else ColorMode.ONOFF
+        self._attr_supported_color_modes = {self._attr_color_mode}
+
+    @callback
+    def async_update_group_state(self) -> None:
+        """Group is on if any member is, brightness is mean of those on."""
+        members = self.members
+        known = [member.is_on for member in members if member.is_on is not None]
+        self._attr_is_on = any(known) if known else None
+
+        brightness = [
+            member.brightness
+            for member in members
+            if member.is_on and member.brightness is not None
+        ]
+        self._attr_brightness = (
+            round(statistics.fmean(brightness)) if brightness else None
+        )
+
+    @override
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        """Turn on all lights."""
+        brightness = kwargs.get(ATTR_BRIGHTNESS)
+        await self.execute_for_members(
+            (object_ids, cls.turn_on_statement(LOOP_OBJECT, brightness))
+            for cls, object_ids in self._member_classes.items()
+        )
+
+    @override
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        """Turn off all lights."""
+        await self.execute_for_members(
+            (object_ids, cls.turn_off_statement(LOOP_OBJECT))
+            for cls, object_ids in self._member_classes.items()
+        )
@@ -0,0 +1,191 @@
+"""Lua script builders used by grenton_direct integration."""
+
+from collections.abc import Iterable
+from typing import Any
+
+from homeassistant.exceptions import HomeAssistantError
+from pygrenton.utils import parse_list
+
+# Serializes a lua value back into a literal that `parse_list` understands.
+_LUA_SERIALIZER = (
+    "local function s(v) local t = type(v) "
+    'if t == "string" then return "\\"" .. v .. "\\"" '
+    'elseif t == "number" or t == "boolean" then return tostring(v) end '
+    'return "nil" end'
+)
+
+# Runs expression of a batch slot in protected mode, keeping its error.
+_LUA_PROTECTED_CALL = (
+    "local function p(i, f) local ok, v = pcall(f) "
+    "if ok then r[i] = v else e[i] = tostring(v) end end"
+)
+
+# name of the object variable in statements of `foreach_expr` loops
+LOOP_OBJECT = "o"
+
+
+class LuaError(HomeAssistantError):
+    """Lua expression raised an error on the CLU."""
+
+
+def lua_literal(value: Any) -> str:
+    """Convert python value into lua literal."""
+    if value is None:
+        return "nil"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str):
+        escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+        return f'"{escaped}"'
+
+    return str(value)
+
+
+def execute_expr(object_id: str, index: int, *args: Any) -> str:
+    """Build lua expression executing object's method."""
+    args_str = ",".join(lua_literal(arg) for arg in args) if args else "0"
+    return f"{object_id}:execute({index},{args_str})"
+
+
+def set_expr(object_id: str, index: int, value: Any) -> str:
+    """Build lua expression setting value of a feature."""
+    return f"{object_id}:set({index},{lua_literal(value)})"
+
+
+def get_expr(object_id: str, index: int) -> str:
+    """Build lua expression getting value of a feature."""
+    return f"{object_id}:get({index})"
+
+
+def block_expr(statements: Iterable[str]) -> str:
+    """Build lua expression running statements in order."""
+    return f"(function() {' '.join(statements)} end)()"
+
+
+def ramped_expr(
+    object_id: str, ramp_index: int, ramp_time: int, statements: Iterable[str]
+) -> str:
+    """
+    Build lua expression running statements with ramp time of an object set.
+
+    Ramp time configured on the CLU is restored once statements are run.
+    """
+    return block_expr(
+        [
+            f"local t = {get_expr(object_id, ramp_index)}",
+            set_expr(object_id, ramp_index, ramp_time),
+            *statements,
+            f"{object_id}:set({ramp_index},t)",
+        ]
+    )
+
+
+def marker_expr(name: str) -> str:
+    """Build lua expression setting global marker, true if it was already set."""
+    return block_expr(
+        [f"local marked = {name} ~= nil", f"{name} = true", "return marked"]
+    )
+
+
+def install_function_expr(
+    table: str, name: str, args: Iterable[str], source: str
+) -> str:
+    """Build lua expression defining a function in a global table."""
+    return block_expr(
+        [
+            f"{table} = {table} or {{}}",
+            f"{table}.{name} = function({','.join(args)})\n{source}\nend",
+            "return true",
+        ]
+    )
+
+
+def foreach_expr(loops: Iterable[tuple[Iterable[str], str]]) -> str:
+    """
+    Build lua expression running statements for every object of a group.
+
+    Each loop is a list of object ids and a statement using `o` as the
+    object, see `LOOP_OBJECT`. Objects missing on the CLU are skipped.
+    """
+    return block_expr(
+        f"for _, {LOOP_OBJECT} in pairs({{{','.join(object_ids)}}}) do {statement} end"
+        for object_ids, statement in loops
+    )
+
+
+def single_script(expr: str) -> str:
+    """
+    Build request evaluating one expression, much shorter than a batch.
+
+    The result is returned as `type:value`, like typed pygrenton requests,
+    and an error as `error:message`.
+    """
+    return (
+        f"(function() local k,v=pcall(function() return {expr} end) "
+        'return (k and type(v) or "error")..":"..tostring(v) end)()'
+    )
+
+
+def parse_single_response(resp: str) -> Any:
+    """
+    Parse response of a request built with `single_script`.
+
+    Failed expression gives `LuaError` instead of a value.
+    """
+    resp_type, _, value = resp.strip().partition(":")
+    if resp_type == "error":
+        return LuaError(value or "error")
+    if resp_type == "number":
+        return float(value)
+    if resp_type == "string":
+        return value
+    if resp_type == "boolean":
+        return value == "true"
+    return None
+
+
+def batch_script(expressions: Iterable[str]) -> str:
+    """
+    Build single lua request evaluating all expressions.
+
+    Results are returned as lua table literal in the same order as expressions.
+    Every expression runs in protected mode, so an error only fails its own
+    slot, which then holds the error message wrapped in a table.
+    """
+    expressions = list(expressions)
+    body = " ".join(
+        f"p({i}, function() return {expr} end)"
+        for i, expr in enumerate(expressions, start=1)
+    )
+
+    return (
+        f"(function() {_LUA_SERIALIZER} local r, e = {{}}, {{}} "
+        f"{_LUA_PROTECTED_CALL} {body} "
+        f"local o = {{}} for i = 1, {len(expressions)} do "
+        'if e[i] then o[i] = "{" .. s((e[i]:gsub(\'"\', "\'"))) .. "}" '
+        "else o[i] = s(r[i]) end end "
+        'return "{" .. table.concat(o, ",") .. "}" end)()'
+    )
+
+
+def parse_batch_response(resp: str, count: int) -> list[Any]:
+    """
+    Parse response of a request built with `batch_script`.
+
+    Slots of failed expressions hold `LuaError` instead of a value.
+    """
+    resp = resp.strip()
+    if resp.startswith("{") and resp.endswith("}"):
+        resp = resp[1:-1]
+
+    if count == 0 or not resp:
+        return [None] * count
+
+    # parse_list can't end with a nested table, the extra value is cut below
+    _, values = parse_list(resp + ",nil")
+    values.extend([None] * (count - len(values)))
+
+    return [
+        LuaError(value[0] if value else "error") if isinstance(value, list) else value
+        for value in values[:count]
+    ]
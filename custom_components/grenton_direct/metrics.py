@@ -0,0 +1,118 @@
+"""Request metrics collected by grenton_direct integration."""
+
+from __future__ import annotations
+
+import bisect
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# upper bounds of histogram buckets in seconds, last bucket is unbounded
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class LatencyHistogram:
+    """Histogram of latencies with fixed buckets."""
+
+    __slots__ = ("buckets", "count", "max", "total")
+
+    def __init__(self) -> None:
+        """Initialize LatencyHistogram."""
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record single latency."""
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float | None:
+        """Mean latency in seconds."""
+        return self.total / self.count if self.count else None
+
+    def percentile(self, q: float) -> float | None:
+        """Upper bound of the bucket containing the q-th percentile."""
+        if not self.count:
+            return None
+
+        rank = q / 100 * self.count
+        cumulative = 0
+        for bound, bucket in zip(LATENCY_BUCKETS, self.buckets, strict=False):
+            cumulative += bucket
+            if cumulative >= rank:
+                return bound
+
+        return self.max
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return histogram as a serializable dict."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": self.max,
+            "buckets": dict(
+                zip([*map(str, LATENCY_BUCKETS), "inf"], self.buckets, strict=True)
+            ),
+        }
+
+
+class CluMetrics:
+    """Latency and throughput metrics of requests sent to a CLU."""
+
+    def __init__(self) -> None:
+        """Initialize CluMetrics."""
+        self.request_latency = LatencyHistogram()
+        self.queue_wait = LatencyHistogram()
+        # queue wait by priority lane
+        self.lane_wait: defaultdict[str, LatencyHistogram] = defaultdict(
+            LatencyHistogram
+        )
+        self.operations: defaultdict[str, LatencyHistogram] = defaultdict(
+            LatencyHistogram
+        )
+        self.objects: defaultdict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+
+        self.requests = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    @contextmanager
+    def measure(self, operation: str, object_id: str | None = None) -> Iterator[None]:
+        """Measure duration of a successful operation issued by an object."""
+        start = time.monotonic()
+        yield
+
+        elapsed = time.monotonic() - start
+        self.operations[operation].observe(elapsed)
+        if object_id is not None:
+            self.objects[object_id].observe(elapsed)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return metrics as a serializable dict."""
+        return {
+            "requests": self.requests,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "request_latency": self.request_latency.as_dict(),
+            "queue_wait": self.queue_wait.as_dict(),
+            "lane_wait": {
+                name: histogram.as_dict() for name, histogram in self.lane_wait.items()
+            },
+            "operations": {
+                name: histogram.as_dict() for name, histogram in self.operations.items()
+            },
+            "objects": {
+                name: histogram.as_dict() for name, histogram in self.objects.items()
+            },
+        }
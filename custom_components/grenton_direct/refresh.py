@@ -0,0 +1,142 @@
+"""Adaptive feature refresh used by grenton_direct integration."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_time_interval
+from pygrenton.clu_client import UpdateContext
+
+from .const import REFRESH_MAX_FACTOR, REFRESH_MIN_FACTOR, REFRESH_TICK
+from .lua import get_expr
+from .transport import Priority
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from datetime import datetime
+
+    from homeassistant.core import HomeAssistant
+
+    from .scheduler import CommandScheduler
+    from .utils import GrentonObject
+
+_LOGGER = logging.getLogger(__name__)
+
+_NOT_POLLED = object()
+
+
+@dataclass(slots=True)
+class _RefreshEntry:
+    obj: GrentonObject
+    index: int
+    interval: float
+    min_interval: float
+    max_interval: float
+    due: float
+    # value seen by the previous poll
+    polled: Any = _NOT_POLLED
+
+
+class RefreshScheduler:
+    """
+    Polls features with refresh hints at an adaptive rate.
+
+    Every feature starts at its configured interval. Each poll that observes
+    a change halves the interval and each poll without a change makes it
+    longer, bounded by `REFRESH_MIN_FACTOR` and `REFRESH_MAX_FACTOR`.
+    """
+
+    def __init__(self, hass: HomeAssistant, scheduler: CommandScheduler) -> None:
+        """Initialize RefreshScheduler."""
+        self._hass = hass
+        self._scheduler = scheduler
+        self._entries: dict[tuple[str, int], _RefreshEntry] = {}
+        self._unsub: Callable[[], None] | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start periodic refresh."""
+        self._unsub = async_track_time_interval(
+            self._hass,
+            self._async_tick,
+            timedelta(seconds=REFRESH_TICK),
+            name="grenton_direct adaptive refresh",
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop periodic refresh."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def async_add(self, obj: GrentonObject, interval: float) -> None:
+        """Refresh all features of the object starting at given interval."""
+        now = time.monotonic()
+        for index in obj.feature_indexes:
+            self._entries[(obj.object_id, index)] = _RefreshEntry(
+                obj,
+                index,
+                interval,
+                interval * REFRESH_MIN_FACTOR,
+                interval * REFRESH_MAX_FACTOR,
+                now + interval,
+            )
+
+    @callback
+    def async_remove(self, obj: GrentonObject) -> None:
+        """Stop refreshing features of the object."""
+        for index in obj.feature_indexes:
+            self._entries.pop((obj.object_id, index), None)
+
+    async def _async_tick(self, _now: datetime) -> None:
+        now = time.monotonic()
+        due = [entry for entry in self._entries.values() if entry.due <= now]
+        if not due:
+            return
+
+        for entry in due:
+            # not due again until this poll finishes
+            entry.due = math.inf
+
+        values = await asyncio.gather(
+            *(
+                self._scheduler.execute(
+                    get_expr(entry.obj.object_id, entry.index), Priority.BACKGROUND
+                )
+                for entry in due
+            ),
+            return_exceptions=True,
+        )
+
+        now = time.monotonic()
+        for entry, value in zip(due, values, strict=True):
+            if isinstance(value, Exception):
+                _LOGGER.debug(
+                    "Refresh of %s:%d failed: %s",
+                    entry.obj.object_id,
+                    entry.index,
+                    value,
+                )
+            else:
+                self._observe(entry, value)
+
+            entry.due = now + entry.interval
+
+    def _observe(self, entry: _RefreshEntry, value: Any) -> None:
+        if entry.polled == value:
+            entry.interval = min(entry.interval * 1.5, entry.max_interval)
+        elif entry.polled is not _NOT_POLLED:
+            entry.interval = max(entry.interval / 2, entry.min_interval)
+
+        entry.polled = value
+        # unchanged values only refresh the cache of the object
+        entry.obj.handle_update(UpdateContext(entry.obj.object_id, entry.index, value))
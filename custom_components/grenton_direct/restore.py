@@ -0,0 +1,63 @@
+"""Persistent feature values used by grenton_direct integration."""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.storage import Store
+
+from .const import STATE_SAVE_DELAY, STATE_STORAGE_KEY, STATE_STORAGE_VERSION
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+
+class StateStore:
+    """
+    Last known feature values kept on disk across restarts.
+
+    Values are remembered in memory as they are observed and written to disk
+    at most once per `STATE_SAVE_DELAY` seconds and on shutdown.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize StateStore."""
+        self._hass = hass
+        self._store: Store[dict[str, dict[str, Any]]] = Store(
+            hass, STATE_STORAGE_VERSION, STATE_STORAGE_KEY
+        )
+        # clu name -> "object_id:index" -> value
+        self._data: dict[str, dict[str, Any]] = {}
+        self._save_pending = False
+        # remember is called from client threads
+        self._lock = threading.Lock()
+
+    async def async_load(self) -> None:
+        """Load values stored by previous run."""
+        self._data = await self._store.async_load() or {}
+
+    def restore(self, clu_name: str, object_id: str, index: int) -> Any:
+        """Get stored value of a feature, `None` if unknown."""
+        return self._data.get(clu_name, {}).get(f"{object_id}:{index}")
+
+    def remember(self, clu_name: str, object_id: str, index: int, value: Any) -> None:
+        """Remember value of a feature, can be called from any thread."""
+        with self._lock:
+            self._data.setdefault(clu_name, {})[f"{object_id}:{index}"] = value
+            if self._save_pending:
+                return
+            self._save_pending = True
+
+        self._hass.loop.call_soon_threadsafe(self._schedule_save)
+
+    @callback
+    def _schedule_save(self) -> None:
+        self._store.async_delay_save(self._data_to_save, STATE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            self._save_pending = False
+            return {clu_name: dict(values) for clu_name, values in self._data.items()}
@@ -0,0 +1,111 @@
+"""Command scheduler used by grenton_direct integration."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import callback
+
+from .const import LUA_BATCH_SIZE
+from .lua import (
+    LuaError,
+    batch_script,
+    parse_batch_response,
+    parse_single_response,
+    single_script,
+)
+from .transport import Priority
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from homeassistant.core import HomeAssistant
+
+    from .transport import CluTransport
+
+
+async def send_lua_batch(
+    transport: CluTransport,
+    expressions: list[str],
+    priority: Priority = Priority.INTERACTIVE,
+) -> list[Any]:
+    """Evaluate lua expressions in a single request."""
+    if len(expressions) == 1:
+        # most flushes carry one command, the batch prelude would dominate it
+        resp = await transport.send_lua_request(
+            single_script(expressions[0]), ignore_type=True, priority=priority
+        )
+        return [parse_single_response(resp)]
+
+    resp = await transport.send_lua_request(
+        batch_script(expressions), ignore_type=True, priority=priority
+    )
+    return parse_batch_response(resp, len(expressions))
+
+
+class CommandScheduler:
+    """
+    Coalesces commands sent to CLU.
+
+    Commands issued within the window are flushed together as combined lua
+    scripts and every caller receives the result of its own expression, or
+    the error it raised. Commands are only combined with others of the same
+    priority.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, transport: CluTransport, window: float
+    ) -> None:
+        """Initialize CommandScheduler."""
+        self._hass = hass
+        self._transport = transport
+        self._window = window
+
+        self._pending: dict[Priority, list[tuple[str, asyncio.Future]]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    async def execute(
+        self, expression: str, priority: Priority = Priority.INTERACTIVE
+    ) -> Any:
+        """Schedule lua expression and wait for its result."""
+        future = self._hass.loop.create_future()
+        self._pending.setdefault(priority, []).append((expression, future))
+
+        if self._flush_handle is None:
+            self._flush_handle = self._hass.loop.call_later(self._window, self._flush)
+
+        return await future
+
+    @callback
+    def _flush(self) -> None:
+        self._flush_handle = None
+        pending, self._pending = self._pending, {}
+
+        for priority in sorted(pending):
+            commands = pending[priority]
+            for start in range(0, len(commands), LUA_BATCH_SIZE):
+                self._hass.async_create_background_task(
+                    self._send(commands[start : start + LUA_BATCH_SIZE], priority),
+                    "grenton_direct command flush",
+                )
+
+    async def _send(
+        self, batch: list[tuple[str, asyncio.Future]], priority: Priority
+    ) -> None:
+        try:
+            results = await send_lua_batch(
+                self._transport, [expr for expr, _ in batch], priority
+            )
+        except Exception as err:  # noqa: BLE001
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(err)
+            return
+
+        for (_, future), result in zip(batch, results, strict=True):
+            if future.done():
+                continue
+            if isinstance(result, LuaError):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,103 @@
+"""Lua script templates used by grenton_direct integration."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+
+from .const import CONF_ARGS, CONF_SOURCE
+from .lua import install_function_expr, lua_literal
+from .transport import Priority
+
+if TYPE_CHECKING:
+    from homeassistant.helpers.typing import ConfigType
+
+    from .clu import GrentonClu
+
+# lua table holding functions installed from templates
+SCRIPTS_TABLE = "gd_scripts"
+
+
+@dataclass(frozen=True, slots=True)
+class ScriptTemplate:
+    """Named lua function body with its parameters."""
+
+    name: str
+    args: tuple[str, ...]
+    source: str
+
+
+class ScriptRegistry:
+    """
+    Script templates of a CLU installed on first use.
+
+    Templates are installed as functions, so later calls only send the
+    function name and arguments. Installed functions are lost when the CLU
+    restarts and are installed again on their next call.
+    """
+
+    def __init__(self, clu: GrentonClu, config: dict[str, ConfigType]) -> None:
+        """Initialize ScriptRegistry."""
+        self._clu = clu
+        self._templates = {
+            name: ScriptTemplate(
+                name, tuple(template[CONF_ARGS]), template[CONF_SOURCE]
+            )
+            for name, template in config.items()
+        }
+        self._installed: set[str] = set()
+        self._lock = asyncio.Lock()
+
+    @property
+    def names(self) -> list[str]:
+        """Names of declared templates."""
+        return list(self._templates)
+
+    def invalidate(self) -> None:
+        """Forget installed functions, e.g. after the CLU restarted."""
+        self._installed.clear()
+
+    async def _async_install(self, template: ScriptTemplate) -> None:
+        async with self._lock:
+            if template.name in self._installed:
+                return
+
+            resp = await self._clu.transport.send_lua_request(
+                install_function_expr(
+                    SCRIPTS_TABLE, template.name, template.args, template.source
+                ),
+                ignore_type=True,
+                priority=Priority.SERVICE,
+            )
+            if resp != "true":
+                msg = f"Installing script {template.name} failed: {resp}"
+                raise HomeAssistantError(msg)
+
+            self._installed.add(template.name)
+
+    async def async_call(self, name: str, args: list[Any]) -> Any:
+        """Call script with given arguments and return its result."""
+        if (template := self._templates.get(name)) is None:
+            msg = f"Unknown script: {name}"
+            raise ServiceValidationError(msg)
+
+        if len(args) != len(template.args):
+            msg = f"Script {name} takes {len(template.args)} arguments"
+            raise ServiceValidationError(msg)
+
+        if name not in self._installed:
+            await self._async_install(template)
+
+        args_str = ",".join(lua_literal(arg) for arg in args)
+        try:
+            with self._clu.metrics.measure("script"):
+                return await self._clu.scheduler.execute(
+                    f"{SCRIPTS_TABLE}.{name}({args_str})", Priority.SERVICE
+                )
+        except Exception:
+            # the function may be gone if the CLU restarted unnoticed
+            self._installed.discard(name)
+            raise
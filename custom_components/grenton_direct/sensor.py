@@ -2,40 +2,105 @@
 
 from __future__ import annotations
 
+import contextlib
+import math
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from datetime import timedelta
+from enum import StrEnum
 from typing import TYPE_CHECKING
 
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    RestoreSensor,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
 from homeassistant.components.sensor.const import (
     CONF_STATE_CLASS,
     DEVICE_CLASSES_SCHEMA,
     STATE_CLASSES_SCHEMA,
 )
-from homeassistant.const import CONF_DEVICE_CLASS, CONF_NAME, CONF_UNIT_OF_MEASUREMENT
+from homeassistant.const import (
+    CONF_DEVICE_CLASS,
+    CONF_NAME,
+    CONF_UNIT_OF_MEASUREMENT,
+    EntityCategory,
+    Platform,
+    UnitOfTime,
+)
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_time_interval
 
+from .clu import async_get_platform_entries
 from .const import (
+    AGGREGATE_BUFFER_SIZE,
+    CLUS,
+    CONF_AGGREGATE,
+    CONF_CLU,
+    CONF_DEADBAND,
     CONF_INDEX,
+    CONF_MIN_INTERVAL,
     CONF_OBJ_ID,
+    CONF_PUBLISH_INTERVAL,
+    CONF_REFRESH_INTERVAL,
+    CONF_STATISTIC,
+    CONF_WINDOW,
+    DEFAULT_AGGREGATE_WINDOW,
+    DISCOVERED_ENTITIES,
     DOMAIN,
-    GRENTON_API,
 )
-from .utils import GrentonObject
+from .utils import GrentonObject, add_grenton_entities, async_add_entry_entities
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+    from datetime import datetime
+
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
-    from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
-    from pygrenton.clu_client import CluClient, UpdateContext
+    from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType, StateType
+    from pygrenton.clu_client import UpdateContext
+
+    from .clu import GrentonClu, GrentonConfigEntry
+
+
+class Statistic(StrEnum):
+    """Statistics published by aggregating sensors."""
+
+    MEAN = "mean"
+    MIN = "min"
+    MAX = "max"
+    # cumulative integral in value hours, e.g. Wh of a power meter in W
+    INTEGRAL = "integral"
+
+
+_POSITIVE_SECONDS = vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False))
+
+AGGREGATE_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_STATISTIC): vol.Coerce(Statistic),
+        vol.Optional(CONF_WINDOW, default=DEFAULT_AGGREGATE_WINDOW): _POSITIVE_SECONDS,
+        vol.Optional(CONF_PUBLISH_INTERVAL): _POSITIVE_SECONDS,
+    }
+)
 
 PLATFORM_SCHEMA = cv.PLATFORM_SCHEMA.extend(
     {
         vol.Required(CONF_OBJ_ID): cv.string,
+        vol.Optional(CONF_CLU): cv.string,
         vol.Required(CONF_INDEX): int,
         vol.Required(CONF_NAME): cv.string,
         vol.Optional(CONF_DEVICE_CLASS): DEVICE_CLASSES_SCHEMA,
+        vol.Optional(CONF_REFRESH_INTERVAL): float,
+        vol.Optional(CONF_DEADBAND): float,
+        vol.Optional(CONF_MIN_INTERVAL): float,
         vol.Optional(CONF_STATE_CLASS): STATE_CLASSES_SCHEMA,
         vol.Optional(CONF_UNIT_OF_MEASUREMENT): cv.string,
+        vol.Optional(CONF_AGGREGATE): AGGREGATE_SCHEMA,
     }
 )
 
@@ -44,22 +109,138 @@ async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
     add_entities: AddEntitiesCallback,
-    discovery_info: DiscoveryInfoType | None = None,  # noqa: ARG001
+    discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Perform the setup for Sensor devices."""
-    grenton_api = hass.data[DOMAIN][GRENTON_API]
+    if discovery_info is not None and DISCOVERED_ENTITIES not in discovery_info:
+        # request statistics sensors of every CLU from configuration.yaml
+        clus: dict[str, GrentonClu] = hass.data[DOMAIN][CLUS]
+        add_entities(
+            GrentonStatsSensor(clu, description)
+            for clu in clus.values()
+            if clu.entry_id is None
+            for description in STATS_SENSORS
+        )
+        return
+
+    clu, entries = await async_get_platform_entries(hass, config, discovery_info)
+    if clu is None:
+        return
+
+    add_grenton_entities(
+        hass,
+        Platform.SENSOR,
+        [_create_sensor(clu, entry) for entry in entries],
+        add_entities,
+    )
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: GrentonConfigEntry,
+    add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up sensors of objects discovered on the CLU of a config entry."""
     add_entities(
-        [GrentonSensor(grenton_api, config)],
-        update_before_add=True,
+        GrentonStatsSensor(entry.runtime_data.clu, description)
+        for description in STATS_SENSORS
     )
+    async_add_entry_entities(hass, entry, Platform.SENSOR, _create_sensor, add_entities)
+
+
+def _create_sensor(clu: GrentonClu, config: ConfigType) -> GrentonSensor:
+    if CONF_AGGREGATE in config:
+        return GrentonAggregateSensor(clu, config)
+    return GrentonSensor(clu, config)
+
+
+def _to_ms(seconds: float | None) -> float | None:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+@dataclass(frozen=True, kw_only=True)
+class GrentonStatsSensorDescription(SensorEntityDescription):
+    """Describes request statistics sensor of a CLU."""
+
+    value_fn: Callable[[GrentonClu], StateType]
+
+
+STATS_SENSORS = (
+    GrentonStatsSensorDescription(
+        key="request_latency",
+        name="request latency p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda clu: _to_ms(clu.metrics.request_latency.percentile(95)),
+    ),
+    GrentonStatsSensorDescription(
+        key="queue_wait",
+        name="queue wait p95",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda clu: _to_ms(clu.metrics.queue_wait.percentile(95)),
+    ),
+    GrentonStatsSensorDescription(
+        key="in_flight",
+        name="requests in flight",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda clu: clu.transport.limiter.in_flight,
+    ),
+    GrentonStatsSensorDescription(
+        key="connection_limit",
+        name="connection limit",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda clu: clu.transport.limiter.limit,
+    ),
+    GrentonStatsSensorDescription(
+        key="requests",
+        name="requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda clu: clu.metrics.requests,
+    ),
+    GrentonStatsSensorDescription(
+        key="timeouts",
+        name="timeouts",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda clu: clu.metrics.timeouts,
+    ),
+    GrentonStatsSensorDescription(
+        key="errors",
+        name="errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda clu: clu.metrics.errors,
+    ),
+)
+
+
+class GrentonStatsSensor(SensorEntity):
+    """Diagnostic sensor exposing request statistics of a CLU."""
+
+    entity_description: GrentonStatsSensorDescription
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self, clu: GrentonClu, description: GrentonStatsSensorDescription
+    ) -> None:
+        """Init GrentonStatsSensor."""
+        self.entity_description = description
+        self._clu = clu
+
+        self._attr_name = f"Grenton {clu.name} {description.name}"
+        self._attr_unique_id = f"{DOMAIN}.{clu.name}.{description.key}"
+
+    async def async_update(self) -> None:
+        """Read current value from CLU metrics."""
+        self._attr_native_value = self.entity_description.value_fn(self._clu)
 
 
 class GrentonSensor(GrentonObject, SensorEntity):
     """Representation of a GrentonSensor."""
 
-    def __init__(self, grenton_api: CluClient, config: ConfigType) -> None:
+    def __init__(self, clu: GrentonClu, config: ConfigType) -> None:
         """Init GrentonSensor."""
-        super().__init__(grenton_api, config)
+        super().__init__(clu, config)
         self._index = config[CONF_INDEX]
 
         self._attr_device_class = config.get(CONF_DEVICE_CLASS, "")
@@ -72,3 +253,168 @@ class GrentonSensor(GrentonObject, SensorEntity):
         self._attr_native_value = ctx.value
 
         self.schedule_update_ha_state()
+
+
+class SampleBuffer:
+    """
+    Fixed size ring buffer of timestamped samples of a signal.
+
+    Samples are stored in preallocated arrays of doubles, so adding one does
+    not allocate. A sample holds its value until the next one, statistics
+    are weighted by time accordingly.
+    """
+
+    __slots__ = ("_count", "_last", "_start", "_times", "_values", "integral")
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize SampleBuffer."""
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._start = 0
+        self._count = 0
+        # position of the newest sample
+        self._last = -1
+        # integral of all samples up to the newest one, in value seconds
+        self.integral = 0.0
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Add a sample."""
+        capacity = len(self._times)
+        if self._count:
+            last = self._last
+            self.integral += self._values[last] * (timestamp - self._times[last])
+
+        self._last = (self._start + self._count) % capacity
+        self._times[self._last] = timestamp
+        self._values[self._last] = value
+        if self._count < capacity:
+            self._count += 1
+        else:
+            self._start = (self._start + 1) % capacity
+
+    def integral_until(self, now: float) -> float:
+        """Integral of the signal until given time, in value seconds."""
+        if not self._count:
+            return 0.0
+        return self.integral + self._values[self._last] * (
+            now - self._times[self._last]
+        )
+
+    def aggregate(self, since: float, now: float) -> tuple[float, float, float] | None:
+        """
+        Time weighted mean, minimum and maximum of the signal since given time.
+
+        Samples replaced by newer ones before `since` are dropped.
+        """
+        capacity = len(self._times)
+        while self._count > 1 and self._times[(self._start + 1) % capacity] <= since:
+            self._start = (self._start + 1) % capacity
+            self._count -= 1
+
+        if not self._count:
+            return None
+
+        total = 0.0
+        low = math.inf
+        high = -math.inf
+        for i in range(self._count):
+            position = (self._start + i) % capacity
+            value = self._values[position]
+            start = max(self._times[position], since)
+            end = self._times[(position + 1) % capacity] if i + 1 < self._count else now
+            total += value * max(end - start, 0.0)
+            low = min(low, value)
+            high = max(high, value)
+
+        duration = now - max(self._times[self._start], since)
+        mean = total / duration if duration > 0 else self._values[self._last]
+        return mean, low, high
+
+
+class GrentonAggregateSensor(GrentonSensor, RestoreSensor):
+    """
+    Sensor publishing windowed statistics of a high rate feature.
+
+    Values are only collected as they arrive and the state is written at a
+    fixed cadence. Integral continues from its last state after a restart.
+    """
+
+    # a value of the previous run is not a sample of the signal
+    _remember_values = False
+
+    def __init__(self, clu: GrentonClu, config: ConfigType) -> None:
+        """Init GrentonAggregateSensor."""
+        aggregate = config[CONF_AGGREGATE]
+        self._statistic: Statistic = aggregate[CONF_STATISTIC]
+        self._window: float = aggregate[CONF_WINDOW]
+        self._publish_interval: float = aggregate.get(
+            CONF_PUBLISH_INTERVAL, self._window
+        )
+
+        self._samples = SampleBuffer(AGGREGATE_BUFFER_SIZE)
+        # handlers are called from client threads
+        self._samples_lock = threading.Lock()
+        # integral published before the last restart, in value hours
+        self._integral_offset = 0.0
+        self._unsub_publish: Callable[[], None] | None = None
+
+        super().__init__(clu, config)
+        # several statistics of the same feature can be configured
+        self._attr_unique_id += f".{self._statistic}"
+
+        if self._statistic == Statistic.INTEGRAL:
+            self._attr_state_class = config.get(
+                CONF_STATE_CLASS, SensorStateClass.TOTAL_INCREASING
+            )
+
+    def _update_handler(self, ctx: UpdateContext) -> None:
+        if not isinstance(ctx.value, int | float):
+            return
+
+        with self._samples_lock:
+            self._samples.append(time.monotonic(), ctx.value)
+
+    async def async_added_to_hass(self) -> None:
+        """Start publishing statistics."""
+        await super().async_added_to_hass()
+        if self._statistic == Statistic.INTEGRAL and (
+            last := await self.async_get_last_sensor_data()
+        ):
+            # unknown when nothing was published before
+            with contextlib.suppress(TypeError, ValueError):
+                self._integral_offset = float(last.native_value)
+        self._unsub_publish = async_track_time_interval(
+            self.hass,
+            self._async_publish,
+            timedelta(seconds=self._publish_interval),
+            name=f"grenton_direct {self.object_id} aggregate",
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop publishing statistics."""
+        await super().async_will_remove_from_hass()
+        if self._unsub_publish is not None:
+            self._unsub_publish()
+            self._unsub_publish = None
+
+    @callback
+    def _async_publish(self, _now: datetime) -> None:
+        now = time.monotonic()
+        with self._samples_lock:
+            if self._statistic == Statistic.INTEGRAL:
+                value = self._integral_offset + self._samples.integral_until(now) / 3600
+            else:
+                aggregate = self._samples.aggregate(now - self._window, now)
+                if aggregate is None:
+                    return
+                mean, low, high = aggregate
+                value = {
+                    Statistic.MEAN: mean,
+                    Statistic.MIN: low,
+                    Statistic.MAX: high,
+                }[self._statistic]
+
+        value = round(value, 3)
+        if value != self._attr_native_value:
+            self._attr_native_value = value
+            self.async_write_ha_state()
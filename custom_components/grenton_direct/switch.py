@@ -7,23 +7,28 @@ from typing import TYPE_CHECKING, Any, override
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
 from homeassistant.components.switch import SwitchEntity
-from homeassistant.const import CONF_NAME
+from homeassistant.const import CONF_OPTIMISTIC, Platform
+from homeassistant.core import callback
 
-from .const import (
-    CONF_OBJ_ID,
-    DOMAIN,
-    GRENTON_API,
-)
-from .utils import GrentonObject
+from .clu import async_get_platform_entries
+from .const import CONF_MEMBERS
+from .group import PLATFORM_OPTIONS, GrentonGroup, platform_schema
+from .lua import LOOP_OBJECT, set_expr
+from .utils import GrentonObject, add_grenton_entities, async_add_entry_entities
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddEntitiesCallback
     from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
-    from pygrenton.clu_client import CluClient, UpdateContext
+    from pygrenton.clu_client import UpdateContext
+
+    from .clu import GrentonClu, GrentonConfigEntry
 
-PLATFORM_SCHEMA = cv.PLATFORM_SCHEMA.extend(
-    {vol.Required(CONF_OBJ_ID): cv.string, vol.Required(CONF_NAME): cv.string}
+PLATFORM_SCHEMA = platform_schema(
+    cv.PLATFORM_SCHEMA.extend(PLATFORM_OPTIONS).extend(
+        {vol.Optional(CONF_OPTIMISTIC): bool}
+    ),
+    CONF_OPTIMISTIC,
 )
 
 
@@ -31,11 +36,32 @@ async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
     add_entities: AddEntitiesCallback,
-    discovery_info: DiscoveryInfoType | None = None,  # noqa: ARG001
+    discovery_info: DiscoveryInfoType | None = None,
 ) -> None:
     """Perform the setup for Light devices."""
-    grenton_api = hass.data[DOMAIN][GRENTON_API]
-    add_entities([GrentonSwitch(grenton_api, config)], update_before_add=True)
+    clu, entries = await async_get_platform_entries(hass, config, discovery_info)
+    if clu is None:
+        return
+
+    if discovery_info is None and CONF_MEMBERS in config:
+        add_entities([GrentonSwitchGroup(clu, config)])
+        return
+
+    add_grenton_entities(
+        hass,
+        Platform.SWITCH,
+        [GrentonSwitch(clu, entry) for entry in entries],
+        add_entities,
+    )
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: GrentonConfigEntry,
+    add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up switches of objects discovered on the CLU of a config entry."""
+    async_add_entry_entities(hass, entry, Platform.SWITCH, GrentonSwitch, add_entities)
 
 
 class GrentonSwitch(GrentonObject, SwitchEntity):
@@ -43,9 +69,9 @@ class GrentonSwitch(GrentonObject, SwitchEntity):
 
     RELAY_STATE_INDEX = 0
 
-    def __init__(self, grenton_api: CluClient, config: ConfigType) -> None:
+    def __init__(self, clu: GrentonClu, config: ConfigType) -> None:
         """Init GrentonSwitch."""
-        super().__init__(grenton_api, config)
+        super().__init__(clu, config)
 
         self.register_update_handler(self.RELAY_STATE_INDEX, self._update_handler)
 
@@ -63,3 +89,28 @@ class GrentonSwitch(GrentonObject, SwitchEntity):
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Tunr switch off."""
         await self.set_value(self.RELAY_STATE_INDEX, 0)
+
+
+class GrentonSwitchGroup(GrentonGroup, SwitchEntity):
+    """Group of grenton relays switched together."""
+
+    @callback
+    def async_update_group_state(self) -> None:
+        """Group is on if any member is."""
+        states = [member.is_on for member in self.members]
+        known = [state for state in states if state is not None]
+        self._attr_is_on = any(known) if known else None
+
+    @override
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        """Turn all switches on."""
+        await self.execute_for_all(
+            set_expr(LOOP_OBJECT, GrentonSwitch.RELAY_STATE_INDEX, 1)
+        )
+
+    @override
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        """Turn all switches off."""
+        await self.execute_for_all(
+            set_expr(LOOP_OBJECT, GrentonSwitch.RELAY_STATE_INDEX, 0)
+        )
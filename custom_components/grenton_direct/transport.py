@@ -0,0 +1,272 @@
+"""Asyncio transport used by grenton_direct integration to talk to CLU."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any
+
+from pygrenton.utils import extract_payload, generate_id_hex
+
+from .const import INTERACTIVE_RESERVED_SLOTS, MAX_CONNECTION_LIMIT
+
+if TYPE_CHECKING:
+    from pygrenton.clu_client import GrentonCipher
+
+    from .metrics import CluMetrics
+
+
+class _ResponseProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol waiting for a single response."""
+
+    def __init__(self, response: asyncio.Future[bytes]) -> None:
+        self._response = response
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:  # noqa: ARG002
+        if not self._response.done():
+            self._response.set_result(data)
+
+    def error_received(self, exc: Exception) -> None:
+        if not self._response.done():
+            self._response.set_exception(exc)
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        if exc is not None and not self._response.done():
+            self._response.set_exception(exc)
+
+
+class Priority(IntEnum):
+    """Lanes of requests waiting for a connection slot, lower ones go first."""
+
+    # commands of entities issued by users
+    INTERACTIVE = 0
+    # service calls like `lua_request`
+    SERVICE = 1
+    # refresh, reads and setup traffic
+    BACKGROUND = 2
+
+
+class ConnectionLimiter:
+    """
+    Bounds the number of requests in flight.
+
+    Waiting requests get free slots lane by lane in `Priority` order and
+    `INTERACTIVE_RESERVED_SLOTS` slots are kept for interactive requests only.
+
+    In adaptive mode the bound follows AIMD: it grows by one after a full
+    window of fast responses and is halved on a timeout or a slow response.
+    """
+
+    def __init__(self, limit: int, latency_target: float, *, adaptive: bool) -> None:
+        """Initialize ConnectionLimiter."""
+        self._limit = limit
+        self._latency_target = latency_target
+        self._adaptive = adaptive
+
+        self._in_flight = 0
+        self._waiters: dict[Priority, deque[asyncio.Future[None]]] = {
+            priority: deque() for priority in Priority
+        }
+
+        self._successes = 0
+        self._last_decrease = 0.0
+
+    @property
+    def limit(self) -> int:
+        """Current number of allowed requests in flight."""
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests in flight."""
+        return self._in_flight
+
+    def _lane_limit(self, priority: Priority) -> int:
+        if priority == Priority.INTERACTIVE:
+            return self._limit
+        return max(1, self._limit - INTERACTIVE_RESERVED_SLOTS)
+
+    def _can_acquire(self, priority: Priority) -> bool:
+        if self._in_flight >= self._lane_limit(priority):
+            return False
+        # requests of higher lanes waiting for a slot go first
+        return not any(self._waiters[lane] for lane in Priority if lane < priority)
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE) -> None:
+        """Wait for a free connection slot in the lane of given priority."""
+        loop = asyncio.get_running_loop()
+        waiters = self._waiters[priority]
+        while not self._can_acquire(priority):
+            waiter = loop.create_future()
+            waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done():
+                    # pass the slot we were woken up for to somebody else
+                    self._wake_waiters()
+                raise
+            finally:
+                if waiter in waiters:
+                    waiters.remove(waiter)
+
+        self._in_flight += 1
+
+    def release(self, latency: float | None) -> None:
+        """
+        Free connection slot.
+
+        `latency` of the finished request is used to adapt the limit, `None`
+        means the request timed out.
+        """
+        self._in_flight -= 1
+        if self._adaptive:
+            self._adapt(latency)
+
+        self._wake_waiters()
+
+    def _adapt(self, latency: float | None) -> None:
+        now = time.monotonic()
+        if latency is None or latency > self._latency_target:
+            self._successes = 0
+            # requests sent before previous decrease reflect the old limit
+            if now - self._last_decrease > self._latency_target:
+                self._limit = max(1, self._limit // 2)
+                self._last_decrease = now
+            return
+
+        self._successes += 1
+        if self._successes >= self._limit:
+            self._successes = 0
+            self._limit = min(self._limit + 1, MAX_CONNECTION_LIMIT)
+
+    def _wake_waiters(self) -> None:
+        woken = 0
+        for priority in Priority:
+            waiters = self._waiters[priority]
+            while waiters and self._in_flight + woken < self._lane_limit(priority):
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    woken += 1
+
+            if waiters:
+                # lower lanes wait until this one is served
+                return
+
+
+class CluTransport:
+    """
+    Sends encrypted requests to CLU without blocking on executor threads.
+
+    Every request uses its own datagram endpoint, same as `CluClient`, and
+    the number of requests in flight is bounded by `ConnectionLimiter`.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        ip: str,
+        port: int,
+        cipher: GrentonCipher,
+        local_ip: str,
+        timeout: float = 1,
+        max_connections: int = 4,
+        *,
+        adaptive: bool = False,
+        metrics: CluMetrics | None = None,
+    ) -> None:
+        """Initialize CluTransport."""
+        self._addr = (ip, port)
+        self._cipher = cipher
+        self._local_ip = local_ip
+        self._timeout = timeout
+        self._metrics = metrics
+
+        self.limiter = ConnectionLimiter(
+            max_connections, timeout / 2, adaptive=adaptive
+        )
+
+    async def send_request(
+        self, msg: str, priority: Priority = Priority.INTERACTIVE
+    ) -> str:
+        """Send raw request to CLU and return decrypted response."""
+        loop = asyncio.get_running_loop()
+        payload = self._cipher.encrypt(msg.encode())
+
+        queued = time.monotonic()
+        await self.limiter.acquire(priority)
+        start = time.monotonic()
+        latency = None
+        if self._metrics is not None:
+            self._metrics.queue_wait.observe(start - queued)
+            self._metrics.lane_wait[priority.name.lower()].observe(start - queued)
+
+        try:
+            response: asyncio.Future[bytes] = loop.create_future()
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: _ResponseProtocol(response), remote_addr=self._addr
+            )
+
+            try:
+                transport.sendto(payload)
+                async with asyncio.timeout(self._timeout):
+                    data = await response
+            finally:
+                transport.close()
+
+            latency = time.monotonic() - start
+        except TimeoutError:
+            if self._metrics is not None:
+                self._metrics.timeouts += 1
+            raise
+        except Exception:
+            if self._metrics is not None:
+                self._metrics.errors += 1
+            raise
+        finally:
+            self.limiter.release(latency)
+
+        if self._metrics is not None:
+            self._metrics.requests += 1
+            self._metrics.request_latency.observe(latency)
+
+        return self._cipher.decrypt(data).decode()
+
+    async def send_lua_request(
+        self,
+        payload: str,
+        *,
+        ignore_type: bool = False,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Any:
+        """
+        Evaluate lua expression on CLU.
+
+        Unless `ignore_type` is set the result is converted to python type the
+        same way as `CluClient.send_lua_request` does.
+        """
+        if not ignore_type:
+            payload = (
+                f'(load("result = {payload} '
+                'return (type(result) .. \\":\\" .. tostring(result))")())'
+            )
+
+        resp = extract_payload(
+            await self.send_request(
+                f"req:{self._local_ip}:{generate_id_hex()}:{payload}", priority
+            )
+        )
+
+        if ignore_type:
+            return resp
+
+        resp_type, _, value = resp.partition(":")
+        if resp_type == "number":
+            return float(value)
+        if resp_type == "string":
+            return value
+        if resp_type == "boolean":
+            return value == "true"
+        return None
@@ -1,40 +1,558 @@
 """Utils used by grenton_direct integration."""
 
-from collections.abc import Callable, Iterable
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
 from typing import Any
 
-from homeassistant.const import CONF_NAME
+from homeassistant.const import CONF_NAME, CONF_OPTIMISTIC, Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType
-from pygrenton.clu_client import CluClient, UpdateContext
+from pygrenton.clu_client import UpdateContext
 
-from .const import CONF_OBJ_ID, DOMAIN
+from .clu import GrentonClu, GrentonConfigEntry
+from .const import (
+    CONF_DEADBAND,
+    CONF_MIN_INTERVAL,
+    CONF_OBJ_ID,
+    CONF_REFRESH_INTERVAL,
+    CONFIGURED_OBJECTS,
+    DOMAIN,
+    ENTITY_BATCH_DELAY,
+    ENTITY_BATCHES,
+    OPTIMISTIC_CONFIRM_TIMEOUT,
+    OPTIMISTIC_TOLERANCE,
+    SIGNAL_OBJECT_UPDATED,
+)
+from .discovery import entity_configs
+from .lua import execute_expr, get_expr, ramped_expr, set_expr
+from .restore import StateStore
+from .transport import Priority
+
+_LOGGER = logging.getLogger(__name__)
 
 
 class GrentonObject:
     """Class that represents grenton object."""
 
-    def __init__(self, grenton_api: CluClient, config: ConfigType) -> None:
+    _attr_should_poll = False
+    # whether feature values are kept in the state store of the CLU
+    _remember_values = True
+
+    def __init__(self, clu: GrentonClu, config: ConfigType) -> None:
         """Initialize GrentonObject."""
-        self._api = grenton_api
+        self._clu = clu
+        self._api = clu.client
         self._object_id = config[CONF_OBJ_ID]
 
         self._attr_name = config[CONF_NAME]
         self._attr_unique_id = DOMAIN + "." + self._object_id
+        self._refresh_interval: float | None = config.get(CONF_REFRESH_INTERVAL)
+        self._deadband: float = config.get(CONF_DEADBAND, 0.0)
+        self._min_interval: float = config.get(CONF_MIN_INTERVAL, 0.0)
+        self._optimistic: bool = config.get(CONF_OPTIMISTIC, False)
+
+        # feature index -> (last known value, monotonic timestamp)
+        self._feature_cache: dict[int, tuple[Any, float]] = {}
+        self._update_handlers: dict[int, Callable[[UpdateContext], None]] = {}
+        # feature index -> last value passed to the update handler
+        self._dispatched_values: dict[int, Any] = {}
+        # feature index -> optimistic value and future resolved on its report
+        self._confirmations: dict[int, tuple[Any, asyncio.Future[None]]] = {}
+
+        self._state_write_pending = False
+        self._last_state_write = 0.0
 
     def register_update_handler(
         self, index: int | Iterable[int], handler: Callable[[UpdateContext], None]
     ) -> None:
-        """Register feature value change handler."""
-        self._api.register_value_change_handler(self._object_id, index, handler)
+        """
+        Register feature value change handler.
+
+        Handlers are registered with CLU once the entity is added to hass.
+        """
+        indexes = (index,) if isinstance(index, int) else tuple(index)
+        for idx in indexes:
+            self._update_handlers[idx] = handler
+            self._restore_value(idx)
+
+    @property
+    def _state_store(self) -> StateStore | None:
+        return self._clu.state_store if self._remember_values else None
+
+    def _restore_value(self, index: int) -> None:
+        store = self._state_store
+        if store is None:
+            return
+
+        value = store.restore(self._clu.name, self._object_id, index)
+        if value is None:
+            return
+
+        # restored value is shown until a live one arrives, but it is not
+        # trusted by the feature cache
+        self._dispatched_values[index] = value
+        self._update_handlers[index](UpdateContext(self._object_id, index, value))
+
+    @property
+    def restored(self) -> bool:
+        """Whether values of all features were restored from previous run."""
+        return self._state_store is not None and all(
+            index in self._dispatched_values for index in self._update_handlers
+        )
+
+    @property
+    def available(self) -> bool:
+        """Entity is unavailable while its CLU does not respond."""
+        return self._clu.available
+
+    @property
+    def clu(self) -> GrentonClu:
+        """CLU the object belongs to."""
+        return self._clu
+
+    @property
+    def object_id(self) -> str:
+        """Id of grenton object."""
+        return self._object_id
+
+    @property
+    def feature_indexes(self) -> list[int]:
+        """Indexes of features with registered update handlers."""
+        return list(self._update_handlers)
+
+    def cached_value(self, index: int) -> Any:
+        """Last known value of a feature."""
+        cached = self._feature_cache.get(index)
+        return cached[0] if cached is not None else None
+
+    def invalidate_cache(self) -> None:
+        """Forget cached values after the object was changed by other means."""
+        self._feature_cache.clear()
+
+    def handle_update(self, ctx: UpdateContext) -> None:
+        """Dispatch feature value change to its handler."""
+        self._feature_cache[ctx.index] = (ctx.value, time.monotonic())
+        pending = self._confirmations.get(ctx.index)
+        if pending is not None and _matches(ctx.value, pending[0]):
+            # called from client threads as well
+            self.hass.loop.call_soon_threadsafe(_resolve, pending[1])
+        if not self._is_significant(ctx.index, ctx.value):
+            return
+
+        self._dispatched_values[ctx.index] = ctx.value
+        if self._state_store is not None:
+            self._state_store.remember(
+                self._clu.name, self._object_id, ctx.index, ctx.value
+            )
+
+        self._update_handlers[ctx.index](ctx)
+
+    def _is_significant(self, index: int, value: Any) -> bool:
+        if index not in self._dispatched_values:
+            return True
+
+        previous = self._dispatched_values[index]
+        if value == previous:
+            return False
+
+        if self._deadband and isinstance(value, float) and isinstance(previous, float):
+            return abs(value - previous) >= self._deadband
+
+        return True
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to value changes and start adaptive refresh."""
+        await super().async_added_to_hass()
+        self._clu.entities[self._object_id] = self
+        self.hass.async_create_background_task(
+            self._async_register_handlers(),
+            f"grenton_direct register {self._object_id}",
+        )
+
+        if self._refresh_interval is not None:
+            self._clu.refresh_scheduler.async_add(self, self._refresh_interval)
+
+    async def _async_register_handlers(self) -> None:
+        try:
+            await self._clu.updates.async_register(
+                self._object_id, self._update_handlers, self.handle_update
+            )
+        except Exception:
+            _LOGGER.exception(
+                "Registering value handlers of %s failed", self._object_id
+            )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop adaptive refresh and value change handling."""
+        await super().async_will_remove_from_hass()
+        self._clu.entities.pop(self._object_id, None)
+        self._clu.updates.unregister(
+            self._object_id, self._update_handlers, self.handle_update
+        )
+        if self._refresh_interval is not None:
+            self._clu.refresh_scheduler.async_remove(self)
+
+    async def async_update(self) -> None:
+        """Read current values of all registered features."""
+        await async_refresh_objects([self])
+
+    def schedule_update_ha_state(self, force_refresh: bool = False) -> None:  # noqa: FBT001, FBT002
+        """
+        Schedule state write if entity was already added to hass.
+
+        Writes requested before the scheduled one runs are coalesced into it
+        and consecutive writes are at least `min_interval` seconds apart.
+        """
+        if self.hass is None or self.entity_id is None:
+            # state will be written when entity is added
+            return
+
+        if force_refresh:
+            super().schedule_update_ha_state(force_refresh)
+            return
+
+        if self._state_write_pending:
+            return
+
+        self._state_write_pending = True
+        self.hass.loop.call_soon_threadsafe(self._async_write_pending_state)
+
+    @callback
+    def _async_write_pending_state(self) -> None:
+        delay = self._last_state_write + self._min_interval - time.monotonic()
+        if delay > 0:
+            self.hass.loop.call_later(delay, self._async_write_pending_state)
+            return
+
+        self._state_write_pending = False
+        self._last_state_write = time.monotonic()
+        self.async_write_ha_state()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write state and let groups of the object know about it."""
+        super().async_write_ha_state()
+        async_dispatcher_send(
+            self.hass, SIGNAL_OBJECT_UPDATED.format(self._clu.name, self._object_id)
+        )
+
+    def is_cached(self, index: int, value: Any) -> bool:
+        """Check if feature is known to have given value."""
+        cached = self._feature_cache.get(index)
+        if cached is None:
+            return False
+
+        cached_value, timestamp = cached
+        # the CLU reports changes, so values stay known while it keeps doing so
+        fresh = max(timestamp, self._clu.registrations_confirmed)
+        max_age = self._clu.cache_max_age
+
+        return cached_value == value and time.monotonic() - fresh <= max_age
 
     async def execute_method(self, index: int, *args: Any) -> Any:
         """Execute object's method."""
-        return await self._api.execute_method_async(self._object_id, index, *args)
+        # methods may change any feature
+        self.invalidate_cache()
+        with self._clu.metrics.measure("execute", self._object_id):
+            return await self._clu.scheduler.execute(
+                execute_expr(self._object_id, index, *args)
+            )
+
+    async def execute_methods(self, *calls: tuple[Any, ...]) -> list[Any]:
+        """
+        Execute multiple object's methods in a single request.
+
+        Each call is a tuple of method index followed by its arguments.
+        """
+        self.invalidate_cache()
+        with self._clu.metrics.measure("execute_batch", self._object_id):
+            return list(
+                await asyncio.gather(
+                    *(
+                        self._clu.scheduler.execute(
+                            execute_expr(self._object_id, *call)
+                        )
+                        for call in calls
+                    )
+                )
+            )
+
+    async def execute_ramped(
+        self, ramp_index: int, transition: float, statements: Iterable[str]
+    ) -> None:
+        """
+        Execute lua statements with ramp time of the object set to `transition`.
+
+        The module ramps to the new values itself, so a fade costs one request.
+        """
+        with self._clu.metrics.measure("ramp", self._object_id):
+            await self._clu.scheduler.execute(
+                ramped_expr(
+                    self._object_id, ramp_index, round(transition * 1000), statements
+                )
+            )
+        # values change gradually and arrive as notifications
+        self.invalidate_cache()
+
+    async def execute_optimistic(
+        self, index: int, value: Any, command: Awaitable[Any]
+    ) -> None:
+        """
+        Run a command setting feature to given value.
+
+        In optimistic mode the value is shown right away and the command is
+        confirmed in the background by reading the feature back once it
+        succeeds. If the CLU does not reach the value in time, the feature is
+        read again and its actual value is shown.
+        """
+        if not self._optimistic or self.hass is None:
+            await command
+            return
+
+        previous = self._confirmations.get(index)
+        if previous is not None:
+            # superseded by this command
+            previous[1].cancel()
+
+        confirmation: asyncio.Future[None] = self.hass.loop.create_future()
+        self._confirmations[index] = (value, confirmation)
+        if _matches(self._dispatched_values.get(index), value):
+            # the CLU does not report values that did not change
+            _resolve(confirmation)
+        self._update_handlers[index](UpdateContext(self._object_id, index, value))
+        # handlers only schedule the write
+        self.async_write_ha_state()
+
+        self.hass.async_create_background_task(
+            self._async_confirm(index, value, command, confirmation),
+            f"grenton_direct confirm {self._object_id}",
+        )
+
+    async def _async_confirm(
+        self,
+        index: int,
+        value: Any,
+        command: Awaitable[Any],
+        confirmation: asyncio.Future[None],
+    ) -> None:
+        try:
+            await command
+            if not confirmation.done():
+                actual = await self.get_value(index, Priority.SERVICE)
+                if confirmation.cancelled() or _matches(actual, value):
+                    return
+                # value may still be changing, e.g. ramping
+                async with asyncio.timeout(OPTIMISTIC_CONFIRM_TIMEOUT):
+                    await asyncio.shield(confirmation)
+        except TimeoutError:
+            reason = "its value was not reported"
+        except Exception as err:  # noqa: BLE001
+            reason = str(err) or type(err).__name__
+        else:
+            return
+        finally:
+            if self._confirmations.get(index, (None, None))[1] is confirmation:
+                del self._confirmations[index]
+
+        if confirmation.cancelled():
+            return
+
+        _LOGGER.warning(
+            "Setting feature %d of %s to %s was not confirmed: %s",
+            index,
+            self._object_id,
+            value,
+            reason,
+        )
+        self.invalidate_cache()
+        try:
+            actual = await self.get_value(index, Priority.SERVICE)
+        except Exception:  # noqa: BLE001
+            # last value reported by the CLU
+            actual = self._dispatched_values.get(index)
+
+        if actual is not None:
+            self._dispatched_values[index] = actual
+            self._update_handlers[index](UpdateContext(self._object_id, index, actual))
 
     async def set_value(self, index: int, value: Any) -> None:
-        """Set value of a feature."""
-        await self._api.set_value_async(self._object_id, index, value)
+        """Set value of a feature unless it is already known to have it."""
+        if self.is_cached(index, value):
+            return
+
+        await self.execute_optimistic(
+            index, value, self._async_write_value(index, value)
+        )
+
+    async def _async_write_value(self, index: int, value: Any) -> None:
+        # known again once the CLU reports it
+        self._feature_cache.pop(index, None)
+        with self._clu.metrics.measure("set", self._object_id):
+            await self._clu.scheduler.execute(set_expr(self._object_id, index, value))
+
+    async def get_value(
+        self, index: int, priority: Priority = Priority.BACKGROUND
+    ) -> Any:
+        """Get value of a feature, reads are background traffic by default."""
+        with self._clu.metrics.measure("get", self._object_id):
+            return await self._clu.scheduler.execute(
+                get_expr(self._object_id, index), priority
+            )
+
+
+def _matches(value: Any, expected: Any) -> bool:
+    if isinstance(value, float) or isinstance(expected, float):
+        try:
+            return abs(value - expected) <= OPTIMISTIC_TOLERANCE
+        except TypeError:
+            return False
+    if isinstance(value, str) and isinstance(expected, str):
+        # e.g. hex colors are reported in either case
+        return value.casefold() == expected.casefold()
+    return value == expected
+
+
+def _resolve(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+async def async_refresh_objects(objects: Iterable[GrentonObject]) -> None:
+    """
+    Read registered features of all objects using coalesced requests.
+
+    Features read successfully are updated even if others fail, the first
+    error is raised afterwards.
+    """
+    features = [(obj, index) for obj in objects for index in obj.feature_indexes]
+    values = await asyncio.gather(
+        *(obj.get_value(index) for obj, index in features), return_exceptions=True
+    )
+
+    errors = []
+    for (obj, index), value in zip(features, values, strict=True):
+        if isinstance(value, Exception):
+            errors.append(value)
+            continue
+        obj.handle_update(UpdateContext(obj.object_id, index, value))
+
+    if errors:
+        raise errors[0]
+
+
+async def _async_reconcile(entities: list[GrentonObject]) -> None:
+    try:
+        await async_refresh_objects(entities)
+    except Exception:
+        _LOGGER.exception("Refresh of %d restored entities failed", len(entities))
+
+
+class EntityBatch:
+    """
+    Collects entities of a platform so they are added with one refresh.
+
+    Each platform entry has its own `add_entities` callback, entities are
+    added by the callback they were queued with.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize EntityBatch."""
+        self._hass = hass
+
+        self._entities: dict[AddEntitiesCallback, list[GrentonObject]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    @callback
+    def add(
+        self, entities: Iterable[GrentonObject], add_entities: AddEntitiesCallback
+    ) -> None:
+        """Queue entities, flushing them once no more arrive."""
+        self._entities.setdefault(add_entities, []).extend(entities)
+
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = self._hass.loop.call_later(ENTITY_BATCH_DELAY, self._flush)
+
+    @callback
+    def _flush(self) -> None:
+        self._flush_handle = None
+        entities, self._entities = self._entities, {}
+
+        self._hass.async_create_background_task(
+            _async_add_refreshed(entities), "grenton_direct add entities"
+        )
+
+
+async def _async_add_refreshed(
+    entities: dict[AddEntitiesCallback, list[GrentonObject]],
+) -> None:
+    """Add entities by their callbacks with a single initial refresh of all."""
+    # entities with restored state are shown right away and reconciled
+    # with live values afterwards
+    pending: dict[AddEntitiesCallback, list[GrentonObject]] = {}
+    for add_entities, added in entities.items():
+        if all(entity.restored for entity in added):
+            add_entities(added)
+        else:
+            pending[add_entities] = added
+
+    objects = [entity for added in entities.values() for entity in added]
+    try:
+        await async_refresh_objects(objects)
+    except Exception:
+        _LOGGER.exception("Initial refresh of %d entities failed", len(objects))
+
+    for add_entities, added in pending.items():
+        add_entities(added)
+
+
+@callback
+def add_grenton_entities(
+    hass: HomeAssistant,
+    platform: str,
+    entities: list[GrentonObject],
+    add_entities: AddEntitiesCallback,
+) -> None:
+    """Add entities, batching them with other entries of the platform if enabled."""
+    if not all(entity.clu.batch_entity_setup for entity in entities):
+        if all(entity.restored for entity in entities):
+            add_entities(entities)
+            hass.async_create_background_task(
+                _async_reconcile(entities), "grenton_direct reconcile entities"
+            )
+        else:
+            add_entities(entities, update_before_add=True)
+        return
+
+    batches: dict[str, EntityBatch] = hass.data[DOMAIN][ENTITY_BATCHES]
+    if platform not in batches:
+        batches[platform] = EntityBatch(hass)
+
+    batches[platform].add(entities, add_entities)
+
+
+@callback
+def async_add_entry_entities(
+    hass: HomeAssistant,
+    entry: GrentonConfigEntry,
+    platform: Platform,
+    factory: Callable[[GrentonClu, ConfigType], GrentonObject],
+    add_entities: AddEntitiesCallback,
+) -> None:
+    """Add entities of objects discovered on the CLU of a config entry."""
+    clu = entry.runtime_data.clu
+    configs = entity_configs(clu, clu.objects, hass.data[DOMAIN][CONFIGURED_OBJECTS])
+    entities = [factory(clu, config) for config in configs.get(platform, [])]
+    if not entities:
+        return
 
-    async def get_value(self, index: int) -> Any:
-        """Get value of a feature."""
-        return await self._api.get_value_async(self._object_id, index)
+    # setup of the entry doesn't wait for the initial refresh
+    entry.async_create_background_task(
+        hass,
+        _async_add_refreshed({add_entities: entities}),
+        f"grenton_direct add {platform} entities",
+    )
@@ -0,0 +1,339 @@
+"""
+Load benchmark running grenton_direct platforms against the CLU simulator.
+
+Sets up Home Assistant with switch, light, cover and sensor entities served
+by `clu_simulator.py` and reports startup time, service call latency
+percentiles and the rate of value change events handled by entities.
+
+    python scripts/benchmark.py --entities 200 --calls 500 --notify-rate 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from clu_simulator import CluSimulator, run_notifications, start_simulator
+from homeassistant import bootstrap, loader
+from homeassistant.const import EVENT_STATE_CHANGED, Platform
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from pygrenton.clu_client import GrentonCipher
+
+ROOT = Path(__file__).resolve().parent.parent
+DOMAIN = "grenton_direct"
+
+# object id prefix, platform, service and its data used to exercise the entity
+ENTITY_KINDS = (
+    ("DOU", Platform.SWITCH, "toggle", {}),
+    ("DIM", Platform.LIGHT, "turn_on", {"brightness": 128}),
+    ("LED", Platform.LIGHT, "turn_on", {"rgbw_color": (255, 128, 0, 0)}),
+    ("ROL", Platform.COVER, "set_cover_position", {"position": 50}),
+    ("AIN", Platform.SENSOR, None, {}),
+)
+
+
+class SimulatorThread(threading.Thread):
+    """Runs the simulator on its own event loop like a separate device."""
+
+    def __init__(self, cipher: GrentonCipher, **kwargs: Any) -> None:
+        """Initialize SimulatorThread."""
+        super().__init__(name="clu simulator", daemon=True)
+        self.loop = asyncio.new_event_loop()
+        self._cipher = cipher
+        self._kwargs = kwargs
+
+        self.port = 0
+        self.simulator: CluSimulator | None = None
+
+    def run(self) -> None:
+        """Run simulator event loop."""
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def start_simulator(self) -> CluSimulator:
+        """Start simulator listening on a free port."""
+        self.start()
+        transport, self.simulator = asyncio.run_coroutine_threadsafe(
+            start_simulator(self._cipher, **self._kwargs), self.loop
+        ).result()
+        self.port = transport.get_extra_info("sockname")[1]
+        return self.simulator
+
+    def start_notifications(self, rate: float) -> asyncio.Future[None]:
+        """Start changing sensor values at given rate."""
+        return asyncio.run_coroutine_threadsafe(
+            run_notifications(self.simulator, rate), self.loop
+        )
+
+
+class EventCounter:
+    """Counts value change events received and handled by entities."""
+
+    def __init__(self) -> None:
+        """Initialize EventCounter."""
+        self.received = 0
+        self.handled = 0
+        self.state_changes = 0
+        self._lock = threading.Lock()
+
+    def patch(self) -> None:
+        """Wrap update handlers registered by grenton_direct entities."""
+        from custom_components.grenton_direct import utils
+
+        handle_update = utils.GrentonObject.handle_update
+        register_update_handler = utils.GrentonObject.register_update_handler
+
+        def counting_handle_update(obj: Any, ctx: Any) -> None:
+            with self._lock:
+                self.received += 1
+            handle_update(obj, ctx)
+
+        def counting_register_update_handler(
+            obj: Any, index: Any, handler: Any
+        ) -> None:
+            register_update_handler(obj, index, self._counting(handler))
+
+        utils.GrentonObject.handle_update = counting_handle_update
+        utils.GrentonObject.register_update_handler = counting_register_update_handler
+
+    def _counting(self, handler: Any) -> Any:
+        def counting_handler(ctx: Any) -> None:
+            with self._lock:
+                self.handled += 1
+            handler(ctx)
+
+        return counting_handler
+
+    @callback
+    def state_changed(self, _event: Event) -> None:
+        """Count state writes."""
+        self.state_changes += 1
+
+
+def build_config(args: argparse.Namespace, port: int, key: str, iv: str) -> dict:
+    """Build configuration with entities spread evenly over entity kinds."""
+    clu_config = {
+        "name": "benchmark",
+        "ip_address": "127.0.0.1",
+        "port": port,
+        "key": key,
+        "iv": iv,
+        "client_ip": "127.0.0.1",
+        "batch_entity_setup": not args.no_batch_setup,
+        "adaptive_connection_limit": args.adaptive,
+    }
+    if args.command_window is not None:
+        clu_config["command_window"] = args.command_window
+    if args.connection_limit is not None:
+        clu_config["connection_limit"] = args.connection_limit
+
+    config: dict[str, Any] = {"homeassistant": {}, DOMAIN: [clu_config]}
+    for i in range(args.entities):
+        prefix, platform, _, _ = ENTITY_KINDS[i % len(ENTITY_KINDS)]
+        entry = {
+            "platform": DOMAIN,
+            "name": f"{prefix} {i}",
+            "object_id": f"{prefix}{i:04d}",
+        }
+        if platform == Platform.SENSOR:
+            entry.update(index=0, device_class="temperature", unit_of_measurement="°C")
+        config.setdefault(platform, []).append(entry)
+
+    return config
+
+
+def percentiles(samples: list[float]) -> dict[str, float | None]:
+    """Return latency percentiles in milliseconds."""
+    if len(samples) < 2:  # noqa: PLR2004
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50": cuts[49] * 1000,
+        "p95": cuts[94] * 1000,
+        "p99": cuts[98] * 1000,
+        "max": max(samples) * 1000,
+    }
+
+
+async def wait_for_entities(
+    hass: HomeAssistant, entities: list[tuple[str, str]]
+) -> list[str]:
+    """Wait until all entities given by platform and unique id have a state."""
+    registry = er.async_get(hass)
+    pending = set(entities)
+    entity_ids = []
+
+    while pending:
+        for platform, unique_id in list(pending):
+            entity_id = registry.async_get_entity_id(platform, DOMAIN, unique_id)
+            if entity_id is not None and hass.states.get(entity_id) is not None:
+                pending.discard((platform, unique_id))
+                entity_ids.append(entity_id)
+
+        await asyncio.sleep(0.01)
+
+    return entity_ids
+
+
+async def run_calls(
+    hass: HomeAssistant, entity_ids: list[str], calls: int, concurrency: int
+) -> list[float]:
+    """Call services of entities and return latency of every call."""
+    services = {
+        prefix: (platform, service, data)
+        for prefix, platform, service, data in ENTITY_KINDS
+    }
+
+    def prefix(entity_id: str) -> str:
+        # entity ids are derived from names starting with the object prefix
+        return entity_id.split(".", 1)[1][:3].upper()
+
+    targets = [
+        entity_id
+        for entity_id in entity_ids
+        if services[prefix(entity_id)][1] is not None
+    ]
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(entity_id: str) -> None:
+        platform, service, data = services[prefix(entity_id)]
+        async with semaphore:
+            start = time.monotonic()
+            await hass.services.async_call(
+                platform, service, {"entity_id": entity_id, **data}, blocking=True
+            )
+            latencies.append(time.monotonic() - start)
+
+    await asyncio.gather(*(call(targets[i % len(targets)]) for i in range(calls)))
+    return latencies
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict[str, Any]:
+    """Run all benchmark phases and return results."""
+    key = base64.b64encode(os.urandom(16)).decode()
+    iv = base64.b64encode(os.urandom(16)).decode()
+
+    simulator_thread = SimulatorThread(
+        GrentonCipher(key, iv), latency=args.latency, travel_time=0.1
+    )
+    simulator = simulator_thread.start_simulator()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        (Path(config_dir) / "custom_components").mkdir()
+        (Path(config_dir) / "custom_components" / DOMAIN).symlink_to(
+            ROOT / "custom_components" / DOMAIN
+        )
+        sys.path.insert(0, config_dir)
+
+        counter = EventCounter()
+        counter.patch()
+
+        hass = HomeAssistant(config_dir)
+        hass.config.skip_pip = True
+        loader.async_setup(hass)
+        hass.bus.async_listen(EVENT_STATE_CHANGED, counter.state_changed)
+
+        config = build_config(args, simulator_thread.port, key, iv)
+        entities = [
+            (platform, f"{DOMAIN}.{entry['object_id']}")
+            for _, platform, _, _ in ENTITY_KINDS
+            for entry in config.get(platform, [])
+        ]
+
+        start = time.monotonic()
+        await bootstrap.async_from_config_dict(config, hass)
+        entity_ids = await wait_for_entities(hass, list(set(entities)))
+        startup = time.monotonic() - start
+
+        latencies = await run_calls(hass, entity_ids, args.calls, args.concurrency)
+
+        received, handled = counter.received, counter.handled
+        sent = simulator.notifications
+        notifications = simulator_thread.start_notifications(args.notify_rate)
+        await asyncio.sleep(args.duration)
+        notifications.cancel()
+
+        clu = hass.data[DOMAIN]["clus"]["benchmark"]
+        results = {
+            "entities": len(entity_ids),
+            "startup_s": startup,
+            "calls": len(latencies),
+            "call_latency_ms": percentiles(latencies),
+            "clu_stats": clu.stats(),
+            "notifications_per_s": (simulator.notifications - sent) / args.duration,
+            "events_received_per_s": (counter.received - received) / args.duration,
+            "events_handled_per_s": (counter.handled - handled) / args.duration,
+            "simulator_requests": simulator.requests,
+            "state_changes": counter.state_changes,
+        }
+
+        await hass.async_stop(force=True)
+
+    return results
+
+
+def print_results(results: dict[str, Any]) -> None:
+    """Print human readable summary."""
+    latency = results["call_latency_ms"]
+    request_latency = results["clu_stats"]["request_latency"]
+    lines = [
+        f"entities:              {results['entities']}",
+        f"startup:               {results['startup_s']:.2f} s",
+        f"service calls:         {results['calls']}",
+        "call latency (ms):     "
+        + "  ".join(f"{k} {v:.1f}" for k, v in latency.items() if v is not None),
+        f"clu requests:          {request_latency['count']}"
+        f" (p95 <= {(request_latency['p95'] or 0) * 1000:.0f} ms)",
+        f"simulator requests:    {results['simulator_requests']}",
+        f"notifications/s:       {results['notifications_per_s']:.1f}",
+        f"events received/s:     {results['events_received_per_s']:.1f}",
+        f"events handled/s:      {results['events_handled_per_s']:.1f}",
+        f"state changes:         {results['state_changes']}",
+    ]
+    print("\n".join(lines))
+
+
+def main() -> None:
+    """Parse arguments and run benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entities", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=200, help="service calls")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--notify-rate", type=float, default=100, help="sensor changes per second"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=5, help="notification phase length"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.005, help="simulated CLU response delay"
+    )
+    parser.add_argument("--command-window", type=float)
+    parser.add_argument("--connection-limit", type=int)
+    parser.add_argument("--adaptive", action="store_true")
+    parser.add_argument("--no-batch-setup", action="store_true")
+    parser.add_argument("--json", action="store_true", help="print results as json")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
+
+
+if __name__ == "__main__":
+    main()
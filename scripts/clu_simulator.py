@@ -0,0 +1,533 @@
+"""
+Offline CLU simulator used for development and benchmarks.
+
+Answers encrypted requests the same way a CLU does, evaluating the subset of
+lua emitted by `pygrenton` and grenton_direct: object `get`, `set` and
+`execute` calls, typed `load` wrappers, batch scripts and client
+registration. Registered clients receive value change notifications, both
+for values changed by requests and for sensor values changing on their own.
+
+    python scripts/clu_simulator.py --key KEY --iv IV --notify-rate 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from pygrenton.clu_client import GrentonCipher
+from pygrenton.utils import parse_list
+
+_LOGGER = logging.getLogger(__name__)
+
+# initial feature values of actuators, other objects are treated as sensors
+INITIAL_FEATURES: dict[str, dict[int, Any]] = {
+    "DOU": {0: 0},
+    "DIM": {0: 0},
+    "LED": {0: 0, 3: 0, 4: 0, 5: 0, 6: "#000000", 15: 0},
+    "ROL": {0: 0, 7: 0},
+}
+SENSOR_VALUE = 20.0
+
+ROLLER_SHUTTER_STOPPED = 0
+ROLLER_SHUTTER_OPENING = 1
+ROLLER_SHUTTER_CLOSING = 2
+
+# feature with ramp time in ms of dimmable objects and steps of a ramp
+RAMP_TIME_INDEX = {"DIM": 4, "LED": 11}
+RAMP_STEPS = 5
+
+_TYPED_RE = re.compile(r'^\(load\("result = (.*) return \(type\(result\)', re.DOTALL)
+_SINGLE_RE = re.compile(
+    r"^\(function\(\) local k,v=pcall\(function\(\) return (.*) end\) return \(k ",
+    re.DOTALL,
+)
+_BATCH_RE = re.compile(
+    r"p\(\d+, function\(\) return (.*?) end\)(?= p\(\d+, | local o = )", re.DOTALL
+)
+_CALL_RE = re.compile(r"^(\w+):(get|set|execute)\((.*)\)$", re.DOTALL)
+_EXISTS_RE = re.compile(r"^(\w+) ~= nil$")
+_RAMPED_RE = re.compile(
+    r"^\(function\(\) local t = (\w+):get\((\d+)\) (.*) \1:set\(\2,t\) end\)\(\)$",
+    re.DOTALL,
+)
+_STATEMENT_SPLIT_RE = re.compile(r" (?=\w+:(?:get|set|execute)\()")
+_MARKER_RE = re.compile(
+    r"^\(function\(\) local marked = (\w+) ~= nil \1 = true return marked end\)\(\)$"
+)
+_INSTALL_RE = re.compile(
+    r"^\(function\(\) (\w+) = \1 or \{\} \1\.(\w+) = function\(([\w,]*)\)\n(.*)\nend "
+    r"return true end\)\(\)$",
+    re.DOTALL,
+)
+_SCRIPT_CALL_RE = re.compile(r"^(\w+)\.(\w+)\((.*)\)$", re.DOTALL)
+_LOOP_RE = re.compile(r"for _, o in pairs\(\{([\w,]*)\}\) do (.*?) end(?= for | end\))")
+_REGISTER_RE = re.compile(
+    r'^SYSTEM:clientRegister\("([^"]*)",(\d+),(\d+),\{(.*)\}\)$', re.DOTALL
+)
+_DESTROY_RE = re.compile(r'^SYSTEM:clientDestroy\("([^"]*)",(\d+),(\d+)\)$')
+
+
+def lua_tostring(value: Any) -> str:
+    """Convert python value the same way lua `tostring` does."""
+    if value is None:
+        return "nil"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def lua_type(value: Any) -> str:
+    """Name of lua type of python value."""
+    if value is None:
+        return "nil"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, int | float):
+        return "number"
+    return "string"
+
+
+def lua_serialize(value: Any) -> str:
+    """Convert python value into literal understood by `parse_list`."""
+    if isinstance(value, str):
+        return f'"{value}"'
+    return lua_tostring(value)
+
+
+def parse_args(args: str) -> list[Any]:
+    """Parse comma separated lua literals."""
+    if not args.strip():
+        return []
+
+    _, values = parse_list(args + "}")
+    return values
+
+
+@dataclass
+class SimulatedObject:
+    """Object living on the simulated CLU."""
+
+    object_id: str
+    features: dict[int, Any] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        """Set initial feature values."""
+        if not self.features:
+            self.features = dict(INITIAL_FEATURES.get(self.object_id[:3], {}))
+
+    @property
+    def is_sensor(self) -> bool:
+        """Whether values of the object change on their own."""
+        return self.object_id[:3] not in INITIAL_FEATURES
+
+    def get(self, index: int) -> Any:
+        """Get value of a feature."""
+        if self.is_sensor:
+            return self.features.setdefault(index, SENSOR_VALUE)
+        return self.features.get(index)
+
+
+@dataclass
+class ClientPage:
+    """Features registered by a client under one client id."""
+
+    addr: tuple[str, int]
+    client_id: int
+    features: list[tuple[str, int]]
+
+
+class CluSimulator(asyncio.DatagramProtocol):
+    """Datagram protocol answering requests as a CLU."""
+
+    def __init__(
+        self,
+        cipher: GrentonCipher,
+        ip: str,
+        *,
+        latency: float = 0.0,
+        travel_time: float = 1.0,
+        object_ids: list[str] | None = None,
+    ) -> None:
+        """Initialize CluSimulator."""
+        self._cipher = cipher
+        self._ip = ip
+        self._latency = latency
+        self._travel_time = travel_time
+        # with no object ids given every object exists
+        self._known = set(object_ids) if object_ids is not None else None
+
+        self.objects: dict[str, SimulatedObject] = {}
+        self.pages: dict[tuple[str, int, int], ClientPage] = {}
+        # lua globals set by clients
+        self.globals: set[str] = set()
+        # functions installed by clients, by table and name
+        self.functions: dict[tuple[str, str], tuple[list[str], str]] = {}
+        # while down requests are not answered
+        self.down = False
+
+        self.requests = 0
+        self.notifications = 0
+
+        self._transport: asyncio.DatagramTransport | None = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """Store transport used to send responses."""
+        self._transport = transport  # type: ignore[assignment]
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """Answer a single request."""
+        if self.down:
+            return
+
+        self.requests += 1
+        try:
+            msg = self._cipher.decrypt(data).decode()
+            kind, _, rest = msg.partition(":")
+            client_ip, _, rest = rest.partition(":")
+            req_id, _, payload = rest.partition(":")
+            if kind != "req":
+                return
+
+            resp = f"resp:{self._ip}:{req_id}:{self.evaluate_payload(payload)}"
+        except Exception:
+            _LOGGER.exception("Invalid request from %s", addr)
+            return
+
+        _LOGGER.debug("%s -> %s", client_ip, payload)
+        self._send(resp, addr, delay=self._latency)
+
+    def get_object(self, object_id: str) -> SimulatedObject | None:
+        """Get object with given id if it exists."""
+        if self._known is not None and object_id not in self._known:
+            return None
+
+        if object_id not in self.objects:
+            self.objects[object_id] = SimulatedObject(object_id)
+        return self.objects[object_id]
+
+    def evaluate_payload(self, payload: str) -> str:
+        """Evaluate request payload and return response payload."""
+        if match := _TYPED_RE.match(payload) or _SINGLE_RE.match(payload):
+            return self._evaluate_typed(match.group(1))
+
+        if match := _INSTALL_RE.match(payload):
+            table, name, args, source = match.groups()
+            self.functions[(table, name)] = (
+                list(filter(None, args.split(","))),
+                source,
+            )
+            return "true"
+
+        if payload.startswith("(function()"):
+            results = [
+                self._evaluate_protected(expr) for expr in _BATCH_RE.findall(payload)
+            ]
+            return "{" + ",".join(results) + "}"
+
+        if match := _REGISTER_RE.match(payload):
+            return self._register(match)
+
+        if match := _DESTROY_RE.match(payload):
+            ip, port, client_id = match.groups()
+            self.pages.pop((ip, int(port), int(client_id)), None)
+            return "nil"
+
+        return lua_tostring(self.evaluate(payload))
+
+    def _evaluate_typed(self, expr: str) -> str:
+        """Evaluate expression, the result is returned as `type:value`."""
+        try:
+            result = self.evaluate(expr)
+        except RuntimeError as err:
+            return f"error:{err}"
+        return f"{lua_type(result)}:{lua_tostring(result)}"
+
+    def _evaluate_protected(self, expr: str) -> str:
+        """Evaluate batch slot, errors are returned wrapped in a table."""
+        try:
+            return lua_serialize(self.evaluate(expr))
+        except RuntimeError as err:
+            return "{" + lua_serialize(str(err).replace('"', "'")) + "}"
+
+    def evaluate(self, expr: str) -> Any:
+        """Evaluate single lua expression."""
+        expr = expr.strip()
+        if expr == "checkAlive()":
+            return f"{id(self) & 0xFFFFFFFF:08x}"
+        if expr.startswith("collectgarbage("):
+            return 0
+
+        if match := _EXISTS_RE.match(expr):
+            return self.get_object(match.group(1)) is not None
+
+        if match := _CALL_RE.match(expr):
+            return self._call(*match.groups())
+
+        return self._evaluate_compound(expr)
+
+    def _evaluate_compound(self, expr: str) -> Any:
+        if expr.startswith("(function() "):
+            return self._evaluate_block(expr)
+
+        if match := _SCRIPT_CALL_RE.match(expr):
+            return self._run_function(*match.groups())
+
+        _LOGGER.warning("Unsupported expression: %s", expr)
+        return None
+
+    def _evaluate_block(self, expr: str) -> Any:
+        if match := _MARKER_RE.match(expr):
+            marked = match.group(1) in self.globals
+            self.globals.add(match.group(1))
+            return marked
+
+        if match := _RAMPED_RE.match(expr):
+            object_id, index, statements = match.groups()
+            saved = self.evaluate(f"{object_id}:get({index})")
+            for statement in _STATEMENT_SPLIT_RE.split(statements):
+                self.evaluate(statement)
+            self.evaluate(f"{object_id}:set({index},{lua_serialize(saved)})")
+            return None
+
+        for object_ids, statement in _LOOP_RE.findall(expr):
+            for object_id in filter(None, object_ids.split(",")):
+                # missing objects are nil and skipped by pairs
+                if self.get_object(object_id) is None:
+                    continue
+                self.evaluate(re.sub(r"^o:", f"{object_id}:", statement))
+        return None
+
+    def _run_function(self, table: str, name: str, args_str: str) -> Any:
+        """Run installed function whose lines are expressions understood here."""
+        if (table, name) not in self.functions:
+            msg = f"attempt to call a nil value (field '{name}')"
+            raise RuntimeError(msg)
+
+        params, source = self.functions[(table, name)]
+        values = parse_args(args_str) if args_str else []
+        result = None
+        for line in filter(None, map(str.strip, source.splitlines())):
+            for param, value in zip(params, values, strict=False):
+                line = re.sub(rf"\b{param}\b", lua_serialize(value), line)  # noqa: PLW2901
+            if line.startswith("return "):
+                return self.evaluate(line.removeprefix("return "))
+            result = self.evaluate(line)
+        return result
+
+    def _call(self, object_id: str, method: str, args_str: str) -> Any:
+        obj = self.get_object(object_id)
+        if obj is None:
+            msg = f"attempt to index a nil value (global '{object_id}')"
+            raise RuntimeError(msg)
+
+        args = parse_args(args_str)
+        index = int(args[0])
+        if method == "get":
+            return obj.get(index)
+        if method == "set":
+            if index == 0 and obj.object_id[:3] in RAMP_TIME_INDEX:
+                self._set_level(obj, args[1])
+            else:
+                self.set_value(obj, index, args[1])
+            return None
+
+        return self.execute(obj, index, args[1:])
+
+    def execute(self, obj: SimulatedObject, index: int, args: list[Any]) -> Any:
+        """Execute method of an object."""
+        prefix = obj.object_id[:3]
+        arg = args[0] if args else None
+
+        if prefix == "DIM" and index in (2, 3):
+            self._set_level(obj, 1.0 if index == 2 else 0.0)  # noqa: PLR2004
+        elif prefix == "LED" and index in (9, 10):
+            self._set_level(obj, 1.0 if index == 9 else 0.0)  # noqa: PLR2004
+        elif prefix in RAMP_TIME_INDEX and index == 0:
+            self._set_level(obj, arg)
+        elif prefix == "LED" and index in (3, 4, 5, 12):
+            self.set_value(obj, 15 if index == 12 else index, arg)  # noqa: PLR2004
+            rgb = (int(obj.features.get(i) or 0) for i in (3, 4, 5))
+            # modules report hex colors in upper case
+            self.set_value(obj, 6, "#" + "".join(f"{c:02X}" for c in rgb))
+        elif prefix == "ROL" and index in (0, 1, 10):
+            target = {0: 100, 1: 0}.get(index, arg)
+            self._move_roller_shutter(obj, target)
+        elif prefix == "ROL" and index == 3:  # noqa: PLR2004
+            self.set_value(obj, 0, ROLLER_SHUTTER_STOPPED)
+        else:
+            self.set_value(obj, index, arg)
+
+        return None
+
+    def restart(self) -> None:
+        """Forget client registrations and lua state like a rebooted CLU."""
+        self.pages.clear()
+        self.globals.clear()
+        self.functions.clear()
+
+    def set_value(self, obj: SimulatedObject, index: int, value: Any) -> None:
+        """Change value of a feature and notify registered clients."""
+        if obj.features.get(index) == value:
+            return
+
+        obj.features[index] = value
+        self.notify(obj.object_id, index)
+
+    def notify(self, object_id: str, index: int) -> None:
+        """Send current values to every page containing the feature."""
+        for page in self.pages.values():
+            if (object_id, index) in page.features:
+                report = self._client_report(page)
+                self._send(f"req:{self._ip}:00000000:{report}", page.addr)
+                self.notifications += 1
+
+    def change_sensor(self) -> bool:
+        """Change value of a random registered sensor feature."""
+        features = {
+            feature
+            for page in self.pages.values()
+            for feature in page.features
+            if self.objects[feature[0]].is_sensor
+        }
+        if not features:
+            return False
+
+        object_id, index = random.choice(sorted(features))  # noqa: S311
+        obj = self.objects[object_id]
+        value = obj.get(index) + random.uniform(-0.5, 0.5)  # noqa: S311
+        self.set_value(obj, index, round(value, 2))
+        return True
+
+    def _set_level(self, obj: SimulatedObject, level: float) -> None:
+        """Change level of a dimmable object, ramping it if ramp time is set."""
+        ramp_time = obj.features.get(RAMP_TIME_INDEX[obj.object_id[:3]]) or 0
+        start = obj.features.get(0) or 0.0
+        if not ramp_time or level == start:
+            self.set_value(obj, 0, level)
+            return
+
+        loop = asyncio.get_running_loop()
+        for step in range(1, RAMP_STEPS + 1):
+            value = round(start + (level - start) * step / RAMP_STEPS, 3)
+            loop.call_later(
+                ramp_time / 1000 * step / RAMP_STEPS, self.set_value, obj, 0, value
+            )
+
+    def _move_roller_shutter(self, obj: SimulatedObject, target: float) -> None:
+        position = obj.features.get(7, 0)
+        if target == position:
+            return
+
+        state = ROLLER_SHUTTER_OPENING if target > position else ROLLER_SHUTTER_CLOSING
+        self.set_value(obj, 0, state)
+
+        def finish() -> None:
+            if obj.features.get(0) != state:
+                # stopped or reversed in the meantime
+                return
+            self.set_value(obj, 7, target)
+            self.set_value(obj, 0, ROLLER_SHUTTER_STOPPED)
+
+        travel = self._travel_time * abs(target - position) / 100
+        asyncio.get_running_loop().call_later(travel, finish)
+
+    def _register(self, match: re.Match[str]) -> str:
+        ip, port, client_id, features_str = match.groups()
+        features = []
+        for object_id, index in re.findall(r"\{(\w+),(\d+)\}", features_str):
+            if self.get_object(object_id) is not None:
+                features.append((object_id, int(index)))
+
+        page = ClientPage((ip, int(port)), int(client_id), features)
+        self.pages[(ip, int(port), int(client_id))] = page
+
+        return self._client_report(page)
+
+    def _client_report(self, page: ClientPage) -> str:
+        values = (
+            lua_serialize(self.objects[object_id].get(index))
+            for object_id, index in page.features
+        )
+        return f"clientReport:{page.client_id}:{{{','.join(values)}}}"
+
+    def _send(self, msg: str, addr: tuple[str, int], delay: float = 0.0) -> None:
+        if self._transport is None:
+            return
+
+        data = self._cipher.encrypt(msg.encode())
+        if delay > 0:
+            asyncio.get_running_loop().call_later(
+                delay, self._transport.sendto, data, addr
+            )
+        else:
+            self._transport.sendto(data, addr)
+
+
+async def start_simulator(
+    cipher: GrentonCipher, host: str = "127.0.0.1", port: int = 0, **kwargs: Any
+) -> tuple[asyncio.DatagramTransport, CluSimulator]:
+    """Start simulator listening on given address."""
+    loop = asyncio.get_running_loop()
+    return await loop.create_datagram_endpoint(
+        lambda: CluSimulator(cipher, host, **kwargs), local_addr=(host, port)
+    )
+
+
+async def run_notifications(simulator: CluSimulator, rate: float) -> None:
+    """Change sensor values `rate` times per second."""
+    if rate <= 0:
+        return
+
+    while True:
+        simulator.change_sensor()
+        await asyncio.sleep(1 / rate)
+
+
+async def main() -> None:
+    """Run simulator until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1234)
+    parser.add_argument("--key", required=True, help="base64 encoded key")
+    parser.add_argument("--iv", required=True, help="base64 encoded iv")
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="delay of every response"
+    )
+    parser.add_argument(
+        "--notify-rate",
+        type=float,
+        default=0.0,
+        help="sensor value changes per second",
+    )
+    parser.add_argument(
+        "--travel-time", type=float, default=1.0, help="roller shutter travel time"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    transport, simulator = await start_simulator(
+        GrentonCipher(args.key, args.iv),
+        args.host,
+        args.port,
+        latency=args.latency,
+        travel_time=args.travel_time,
+    )
+    _LOGGER.info("CLU simulator listening on %s:%d", args.host, args.port)
+
+    try:
+        await run_notifications(simulator, args.notify_rate)
+        await asyncio.Event().wait()
+    finally:
+        transport.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())